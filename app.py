@@ -8,17 +8,29 @@ Usage:
     python app.py
 
 The app will start at http://127.0.0.1:5001
+
+Environment:
+    PORT              Port to listen on (default: 5001)
+    FLASK_ENV         Set to "development" to use the Flask dev server
+    FLASK_DEBUG       Set to "1" to enable the debugger and reloader (dev server only)
+    QUIET             Set to suppress the startup banner
+    USE_ASGI          Set to "1" to serve asgi.py with uvicorn on uvloop
+    WAITRESS_THREADS  Worker threads for waitress (default: 8)
+    RESULT_CACHE_TTL  Seconds to cache lookup results per title (default: 21600, 0 disables)
+    LOOKUP_WORKERS    Maximum concurrent lookups (default: 32)
+    LOOKUP_TIMEOUT    Seconds before a lookup gives up (default: 30)
+    IMDB_POSTER_TIMEOUT  Seconds a lookup waits for its IMDb poster (default: 10)
+    CORS_ORIGINS      Comma-separated origins allowed cross-origin (default: *)
+
+In production, gunicorn (wsgi.py) is used when installed, otherwise waitress.
 """
 
 import os
+import shutil
+import sys
 import logging
 from app import create_app
-
-# Configure logging for the application
-logging.basicConfig(
-    level=logging.INFO,
-    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
-)
+from app.routes import COOKIES_PATH
 
 logger = logging.getLogger(__name__)
 
@@ -26,31 +38,62 @@ logger = logging.getLogger(__name__)
 app = create_app()
 
 
+def warmup():
+    """Load the scraper modules and resolve outbound hosts before serving in this process"""
+    from app.models import NetflixScraper, PosterFetcher  # noqa: F401
+    NetflixScraper.warmup()
+
+
 def main():
     """Main entry point"""
     # Determine port
     port = int(os.environ.get('PORT', 5001))
 
-    # Check for cookies file (both locations)
-    cookies_path_new = os.path.join(os.getcwd(), "cookies", "cookies.txt")
-    cookies_path_old = os.path.join(os.getcwd(), "cookies.txt")
-    cookies_exist = os.path.exists(cookies_path_new) or os.path.exists(cookies_path_old)
-
-    # Print startup banner
-    print("\n" + "="*60)
-    print("Netflix Format Checker")
-    print("="*60)
-    print(f"\nServer starting at http://127.0.0.1:{port}")
-    print(f"Cookies File: {'✓ Found' if cookies_exist else '✗ Not Found'}")
-
-    if not cookies_exist:
-        print("\n⚠️  WARNING: cookies.txt not found!")
-        print("   Export Netflix cookies and save to cookies/ folder\n")
-
-    print("="*60 + "\n")
-
-    # Run the Flask development server
-    app.run(debug=True, host='0.0.0.0', port=port, threaded=True)
+    cookies_exist = COOKIES_PATH is not None
+
+    # Print startup banner in a single write (suppressed when QUIET is set)
+    if not os.environ.get('QUIET'):
+        banner = (
+            "\n" + "="*60 + "\n"
+            "Netflix Format Checker\n"
+            + "="*60 + "\n"
+            f"\nServer starting at http://127.0.0.1:{port}\n"
+            f"Cookies File: {'✓ Found' if cookies_exist else '✗ Not Found'}\n"
+        )
+        if not cookies_exist:
+            banner += (
+                "\n⚠️  WARNING: cookies.txt not found!\n"
+                "   Export Netflix cookies and save to cookies/ folder\n\n"
+            )
+        banner += "="*60 + "\n\n"
+        sys.stdout.write(banner)
+        sys.stdout.flush()
+
+    if os.environ.get('USE_ASGI') == '1':
+        # Run the ASGI server on a uvloop event loop
+        import uvicorn
+        warmup()
+        uvicorn.run('asgi:application', host='0.0.0.0', port=port,
+                    loop='uvloop', http='httptools', workers=1)
+    elif os.environ.get('FLASK_ENV') == 'development':
+        # Run the Flask development server (debugger/reloader only on request)
+        debug = os.environ.get('FLASK_DEBUG') == '1'
+        warmup()
+        app.run(debug=debug, use_reloader=debug, use_debugger=debug,
+                host='0.0.0.0', port=port, threaded=True, processes=1)
+    elif os.name == 'posix' and shutil.which('gunicorn'):
+        # Replace this process with preloaded gunicorn workers (one per CPU)
+        os.execvp('gunicorn', [
+            'gunicorn', '-w', str(os.cpu_count() or 1), '--preload',
+            '--threads', '4', '--bind', f'0.0.0.0:{port}', 'wsgi:application'
+        ])
+    else:
+        # Run the production WSGI server
+        from waitress import serve
+        warmup()
+        serve(app, host='0.0.0.0', port=port,
+              threads=int(os.environ.get('WAITRESS_THREADS', 8)),
+              channel_timeout=60)
 
 
 if __name__ == '__main__':
@@ -2,34 +2,99 @@
 Netflix Format Checker - Flask Application Package
 """
 
-from flask import Flask
+from flask import Flask, request
+from flask.json.provider import JSONProvider
 import logging
+import os
+import orjson
+
+# Origins allowed to make cross-origin requests (CORS_ORIGINS, comma-separated; "*" allows any)
+_CORS_ORIGINS = frozenset(origin.strip() for origin in os.environ.get('CORS_ORIGINS', '*').split(',')
+                          if origin.strip())
+
+# CORS headers, only needed for cross-origin requests from an allowed origin
+_CORS_HEADERS = [
+    ('Access-Control-Allow-Methods', 'GET, POST, OPTIONS'),
+    ('Access-Control-Allow-Headers', 'Content-Type'),
+]
+
+# Headers added to every response
+_SECURITY_HEADERS = [
+    ('X-Content-Type-Options', 'nosniff'),
+    ('X-Frame-Options', 'SAMEORIGIN'),
+]
+
+class ORJSONProvider(JSONProvider):
+    """Flask JSON provider backed by orjson"""
+
+    def dumps(self, obj, **kwargs):
+        return orjson.dumps(obj, option=orjson.OPT_NON_STR_KEYS).decode()
+
+    def loads(self, s, **kwargs):
+        return orjson.loads(s)
+
+def configure_logging():
+    """Configure logging for the application (every entry point goes through create_app)"""
+    logging.basicConfig(
+        level=logging.INFO,
+        format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+    )
+
+    # The log format uses no thread, process or caller fields, so skip collecting them
+    logging.logThreads = False
+    logging.logProcesses = False
+    logging._srcfile = None
+
+# Application instance returned by every create_app() call after the first
+_APP = None
 
 def create_app():
-    """Create and configure the Flask application"""
+    """Create and configure the Flask application (once per process)"""
+    global _APP
+    if _APP is not None:
+        return _APP
+
     app = Flask(__name__,
                 template_folder='../templates',
                 static_folder='../static')
 
     # Configure logging
-    logging.basicConfig(
-        level=logging.INFO,
-        format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
-    )
+    configure_logging()
+
+    # Serialize JSON responses with orjson
+    app.json = ORJSONProvider(app)
+
+    # Match routes with or without a trailing slash (no redirect round-trip)
+    app.url_map.strict_slashes = False
 
     # Register blueprints/routes
     from app.routes import bp
     app.register_blueprint(bp)
 
+    # Build the URL matcher now instead of on the first request
+    app.url_map.update()
+
+    @app.before_request
+    def before_request():
+        """Answer OPTIONS preflights on known routes without dispatching to a view"""
+        if request.method == 'OPTIONS' and request.url_rule is not None:
+            # A fresh response per request; after_request adds the CORS headers
+            return app.response_class(status=204,
+                                      headers={'Allow': ', '.join(sorted(request.url_rule.methods))})
+
     # Add after_request handler
     @app.after_request
     def after_request(response):
-        """Add headers to every response"""
-        response.headers['Access-Control-Allow-Origin'] = '*'
-        response.headers['Access-Control-Allow-Methods'] = 'GET, POST, OPTIONS'
-        response.headers['Access-Control-Allow-Headers'] = 'Content-Type'
-        response.headers['X-Content-Type-Options'] = 'nosniff'
-        response.headers['X-Frame-Options'] = 'SAMEORIGIN'
+        """Add security headers to every response, CORS headers when cross-origin"""
+        response.headers.update(_SECURITY_HEADERS)
+
+        # CORS headers depend on the Origin header, so shared caches must key on it
+        response.vary.add('Origin')
+        origin = request.headers.get('Origin')
+        if origin and ('*' in _CORS_ORIGINS or origin in _CORS_ORIGINS):
+            response.headers['Access-Control-Allow-Origin'] = '*' if '*' in _CORS_ORIGINS else origin
+            response.headers.update(_CORS_HEADERS)
         return response
 
+    _APP = app
     return app
@@ -2,7 +2,15 @@
 Models package - Netflix scraping and poster fetching
 """
 
-from app.models.netflix_scraper import NetflixScraper
-from app.models.poster_fetcher import PosterFetcher
-
 __all__ = ['NetflixScraper', 'PosterFetcher']
+
+
+def __getattr__(name):
+    """Import model classes on first access"""
+    if name == 'NetflixScraper':
+        from app.models.netflix_scraper import NetflixScraper
+        return NetflixScraper
+    if name == 'PosterFetcher':
+        from app.models.poster_fetcher import PosterFetcher
+        return PosterFetcher
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -3,30 +3,357 @@ Netflix Format Checker - Pure HTML Scraping Approach
 No API calls, just parse the Netflix title page HTML
 """
 
+import os
+import codecs
+import time
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as PosterTimeout
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 import re
-import json
+import orjson
+import socket
+from functools import lru_cache
 from http.cookiejar import MozillaCookieJar
 from app.models.poster_fetcher import PosterFetcher, extract_year_from_title
 
+try:
+    import ahocorasick
+except ImportError:  # Optional: fall back to plain substring checks
+    ahocorasick = None
+
+try:
+    import brotli  # noqa: F401  (urllib3 only decodes "br" when a brotli package is installed)
+    _ACCEPT_ENCODING = 'gzip, deflate, br'
+except ImportError:
+    try:
+        import brotlicffi  # noqa: F401
+        _ACCEPT_ENCODING = 'gzip, deflate, br'
+    except ImportError:
+        _ACCEPT_ENCODING = 'gzip, deflate'
+
+# Title extraction
+_RE_OG_TITLE = re.compile(r'<meta property="og:title" content="([^"]+)"')
+_RE_TITLE_TAG = re.compile(r'<title[^>]*>([^<]+)</title>')
+
+# Year extraction (in priority order)
+_RE_DATE_CREATED = re.compile(r'"dateCreated"\s*:\s*"(\d{4})-')
+_RE_SPAN_YEAR = re.compile(r'<span class="year">\((\d{4})\)</span>')
+_RE_RELEASE_YEAR = re.compile(r'"releaseYear"\s*(?:\{{"?\$type"?:?"atom",?"?value"?:)?(\d{4})')
+_RE_PROD_YEAR = re.compile(r'"productionYear":\s*(\d{4})')
+_RE_OG_TITLE_YEAR = re.compile(r'<meta\s+property="og:title"\s+content="[^"]*\((\d{4})\)"')
+_RE_GENERIC_YEAR = re.compile(r'"year":\s*(\d{4})')
+
+# Title-matched releaseYear (Priority 0), applied to the lowercased page
+_RE_TITLE_KEY_BEFORE = re.compile(r'"title"\s*:\s*$')
+_RE_TITLE_RELEASE_YEAR = re.compile(r'"releaseyear"\s*(?:\{"?\$type"?:?"atom",?"?value"?:)?(\d{4})')
+_RE_BRACE = re.compile(r'[{}]')
+
+# All of the above as one alternation, so the page is scanned once.
+# Each named group wraps one pattern whose single capture is the year.
+_YEAR_SOURCES = (
+    ('date_created', _RE_DATE_CREATED, 'JSON-LD dateCreated'),
+    ('span_year', _RE_SPAN_YEAR, 'HTML'),
+    ('release_year', _RE_RELEASE_YEAR, 'last releaseYear match'),
+    ('production_year', _RE_PROD_YEAR, 'productionYear'),
+    ('og_title', _RE_OG_TITLE_YEAR, 'og:title'),
+    ('generic_year', _RE_GENERIC_YEAR, 'generic year field'),
+)
+_RE_YEAR_ANY = re.compile('|'.join(f'(?P<{name}>{regex.pattern})' for name, regex, _ in _YEAR_SOURCES))
+
+# Poster extraction
+_RE_OG_IMAGE = re.compile(r'<meta property="og:image" content="([^"]+)"')
+_RE_TWITTER_IMAGE = re.compile(r'<meta name="twitter:image" content="([^"]+)"')
+_GENERIC_POSTER_PATTERNS = [
+    re.compile(r'"boxshot":\s*"([^"]+)"'),
+    re.compile(r'"poster":\s*"([^"]+)"'),
+    re.compile(r'"image":\s*"(https://[^"]*nflximg[^"]+)"'),
+    re.compile(r'"url":\s*"(https://[^"]*occ-\d+-\d+\.nflxso[^"]+)"'),
+]
+
+# Format extraction
+_RE_DELIVERY = re.compile(r'"delivery":\s*\{("has[^}]+)\}')
+
+
+# A delivery object belongs to a title when the title ID appears within this many characters before it
+_DELIVERY_CONTEXT = 1000
+_DELIVERY_PREFIX = '"delivery":'
+
+
+def _iter_title_deliveries(html, title_id):
+    """Yield parsed delivery objects that follow an occurrence of the title ID, in page order
+
+    Finds the title ID with str.find and only looks for delivery objects in the window
+    after each occurrence, instead of regex-scanning the whole page.
+    """
+    needle = f'"{title_id}"'
+    scanned = 0
+    idx = html.find(needle)
+    while idx != -1:
+        window_end = idx + _DELIVERY_CONTEXT + len(_DELIVERY_PREFIX)
+        pos = html.find(_DELIVERY_PREFIX, max(idx + len(needle), scanned), window_end)
+        while pos != -1:
+            match = _RE_DELIVERY.match(html, pos)
+            if match:
+                try:
+                    yield orjson.loads('{' + match.group(1) + '}')
+                except orjson.JSONDecodeError:
+                    pass
+                scanned = match.end()
+                pos = html.find(_DELIVERY_PREFIX, match.end(), window_end)
+            else:
+                pos = html.find(_DELIVERY_PREFIX, pos + 1, window_end)
+        scanned = max(scanned, window_end - len(_DELIVERY_PREFIX) + 1)
+        idx = html.find(needle, idx + 1)
+
+
+# Text patterns for format detection (matched against the lowercased page)
+_FEATURE_PATTERNS = {
+    'uhd': [
+        'ultra hd', 'ultrahd', '4k', 'uhd', '2160p',
+        '"is4k":true', '"has4k":true', 'hasultra'
+    ],
+    'hd': ['1080p', '"isHd":true', 'high definition'],
+    'dolby_vision': [
+        'dolby vision', 'dolbyvision', 'dolby-vision', 'vision-enabled',
+        'profiledolbyvision', 'dovi-enabled', 'dovi', 'dvhe', 'dvh1',
+        '"hasdolbyvision":true', 'hasdolbyvision'
+    ],
+    'hdr10': [
+        'hdr10', 'hdr-10', 'hdr 10', 'high dynamic range',
+        'hdr-enabled', 'hdr enabled', '"hashdr":true', 'hashdr10'
+    ],
+    'atmos': [
+        'dolby atmos', 'dolbyatmos', 'dolby-atmos', 'atmosenabled',
+        'atmos-enabled', 'atmos audio', '"hasdolbyatmos":true',
+        'hasdolbyatmos', 'hasatmos'
+    ],
+    'dolby_digital': ['dolby digital', 'dolby-digital', 'ac-3', 'ac3', '5.1', '5.1 dolby'],
+    'spatial_audio': ['spatial audio', 'spatial-audio'],
+}
+
+
+def _build_feature_automaton():
+    """Build an Aho-Corasick automaton over all feature patterns"""
+    if ahocorasick is None:
+        return None
+    automaton = ahocorasick.Automaton()
+    for feature, patterns in _FEATURE_PATTERNS.items():
+        for pattern in patterns:
+            automaton.add_word(pattern, feature)
+    automaton.make_automaton()
+    return automaton
+
+
+_FEATURE_AUTOMATON = _build_feature_automaton()
+
+
+def _scan_features(html_lower):
+    """Return the names of all features whose patterns occur in the page, in one pass
+
+    The pass stops as soon as every feature has been seen.
+    """
+    if _FEATURE_AUTOMATON is not None:
+        found = set()
+        for _, feature in _FEATURE_AUTOMATON.iter(html_lower):
+            found.add(feature)
+            if len(found) == len(_FEATURE_PATTERNS):
+                break
+        return found
+    return {feature for feature, patterns in _FEATURE_PATTERNS.items()
+            if any(pattern in html_lower for pattern in patterns)}
+
+# Availability (matched against the lowercased page). The coming-soon patterns are in
+# priority order and scanned as one alternation; only the first has no date capture.
+_COMING_PATTERNS = [
+    r'coming\s+soon',
+    r'coming\s+([a-z]+\s+\d+)',
+    r'join\s+us\s+on\s+(\w+\s+\d+)',
+    r'streaming\s+from\s+([a-z]+\s+\d+)',
+    r'available\s+([a-z]+\s+\d+)',
+    r'arrives?\s+([a-z]+\s+\d+)',
+]
+_RE_COMING = re.compile('|'.join(f'(?P<c{i}>{pattern})' for i, pattern in enumerate(_COMING_PATTERNS)))
+_RE_COMING_DATE = re.compile(r'([A-Za-z]+\s+\d{1,2},?\s+\d{4})')
+_RE_AVAILABLE = re.compile(r'streaming\s+now|watch\s+now|available\s+now')
+
+# Content type (movie indicators take priority; matched against the lowercased page)
+# Each entry is (literal the match must contain, regex or None when the literal is enough)
+_MOVIE_PATTERNS = [
+    ('"movie"', re.compile(r'"type"\s*:\s*"movie"')),
+    ('"film"', re.compile(r'"type"\s*:\s*"film"')),
+    ('"isshow"', re.compile(r'"isshow"\s*:\s*false')),
+    ('"contenttype"', re.compile(r'"contenttype"\s*:\s*"movie"')),
+]
+_SERIES_PATTERNS = [
+    ('"series"', re.compile(r'"type"\s*:\s*"series"')),
+    ('"isshow"', re.compile(r'"isshow"\s*:\s*true')),
+    ('tvshow', None),
+    ('tv series', None),
+    ('season', None),
+    ('episode', None),
+    ('"contenttype"', re.compile(r'"contenttype"\s*:\s*"series"')),
+]
+
+
+def _decode_title(title_str):
+    """Decode escaped characters in title"""
+    # Fast path: without a backslash there is nothing to decode
+    if '\\' not in title_str:
+        return title_str.strip()
+    # Replace \x20 with space and other common escapes
+    title_str = title_str.replace('\\x20', ' ')
+    title_str = title_str.replace('\\x27', "'")
+    title_str = title_str.replace('\\x26', '&')
+    # Use codecs to handle any remaining hex escapes
+    try:
+        # Encode to bytes and decode to handle unicode escapes
+        title_str = codecs.decode(title_str, 'unicode_escape')
+    except:
+        pass
+    return title_str.strip()
+
+
+@lru_cache(maxsize=128)
+def _title_id_patterns(title_id):
+    """Compile the patterns anchored on a title ID (cached per title)"""
+    return {
+        # Title near the title ID
+        'title': re.compile(rf'{title_id}[^}}{{]{{0,200}}?"title":\s*"([^"]+)"'),
+        'name': re.compile(rf'{title_id}[^}}{{]{{0,200}}?"name":\s*"([^"]+)"'),
+        'keyed_title': re.compile(rf'"{title_id}":\s*{{[^}}]{{0,500}}?"title":\s*"([^"]+)"'),
+        # boxArt with poster dimensions (342w, 500w, 600w)
+        'poster_dimensions': [
+            re.compile(rf'"{title_id}"[^{{]*{{[^}}]*"boxArt"[^{{]*{{[^}}]*"342w":\s*"([^"]+)"'),
+            re.compile(rf'"{title_id}"[^{{]*{{[^}}]*"boxArt"[^{{]*{{[^}}]*"500w":\s*"([^"]+)"'),
+            re.compile(rf'"{title_id}"[^{{]*{{[^}}]*"boxArt"[^{{]*{{[^}}]*"600w":\s*"([^"]+)"'),
+        ],
+        # Generic boxArt with url field
+        'box': [
+            re.compile(rf'"{title_id}"[^{{]*{{[^}}]*"boxArt"[^{{]*{{[^}}]*"url":\s*"([^"]+)"'),
+            re.compile(rf'"{title_id}"[^}}]{{0,500}}"boxArt"[^}}]{{0,200}}"url":\s*"([^"]+)"'),
+        ],
+    }
+
+
+# In-process cache of check_formats() results, keyed on (title_id, cookies path, cookies mtime)
+# so re-exporting cookies.txt invalidates it. RESULT_CACHE_TTL=0 disables the cache.
+RESULT_CACHE_TTL = int(os.environ.get('RESULT_CACHE_TTL', 6 * 3600))
+RESULT_CACHE_SIZE = 512
+
+# Default check_formats() result, copied for each lookup
+_RESULT_TEMPLATE = {
+    'title': None,
+    'year': None,
+    'poster': None,
+    'dolby_vision': False,
+    'hdr10': False,
+    'atmos': False,
+    'dolby_digital': False,
+    'spatial_audio': False,
+    'uhd': False,
+    '4k': False,
+    'hd': False,
+    'sdr': False,
+    'is_available': True,
+    'availability_status': 'Available',
+    'coming_date': None,
+    'is_series': False
+}
+
+# Background IMDb poster lookups (see check_formats), one worker per concurrent lookup
+# (LOOKUP_WORKERS, as in app.routes) so lookups never queue behind each other's posters.
+# A lookup waits at most IMDB_POSTER_TIMEOUT seconds for its poster, then uses Netflix's.
+_POSTER_EXECUTOR = ThreadPoolExecutor(max_workers=int(os.environ.get('LOOKUP_WORKERS', 32)),
+                                      thread_name_prefix='imdb-poster')
+IMDB_POSTER_TIMEOUT = int(os.environ.get('IMDB_POSTER_TIMEOUT', 10))
+
+# Parsed cookies.txt jars: path -> (mtime, jar), only the latest version of each file is kept
+_cookies_cache = {}
+
+# Title pages are streamed in chunks, and reading stops at PAGE_READ_LIMIT characters
+PAGE_CHUNK_SIZE = 64 * 1024
+PAGE_READ_LIMIT = 8 * 1024 * 1024
+_result_cache = OrderedDict()
+_result_cache_lock = threading.Lock()
+
 
 class NetflixScraper:
     """Netflix format checker using pure HTML scraping"""
 
-    def __init__(self, cookies_path):
+    def __init__(self, cookies_path, session=None):
+        """
+        :param cookies_path: Path to Netflix cookies.txt
+        :param session: Optional requests.Session to reuse (keeps its connection pool)
+        """
         self.cookies_path = cookies_path
-        self.session = requests.Session()
+        self._cookies_mtime = None
+        if session is None:
+            session = requests.Session()
+            self.mount_pooled_adapter(session)
+        self.session = session
         self._load_cookies()
         self._setup_headers()
         self.dolby_digital_detected = False
         self.spatial_audio_detected = False
-        self.poster_fetcher = PosterFetcher()  # Initialize TMDB poster fetcher
+        self._poster_fetcher = None  # TMDB poster fetcher, created on first use
+
+    def cookies_changed(self):
+        """Return True if cookies.txt was modified (or removed) since it was loaded"""
+        try:
+            return os.stat(self.cookies_path).st_mtime != self._cookies_mtime
+        except OSError:
+            return True
+
+    @property
+    def poster_fetcher(self):
+        """Poster fetcher, constructed the first time a poster lookup needs it
+
+        Not locked: check_formats builds it before handing a lookup to the poster pool.
+        """
+        if self._poster_fetcher is None:
+            self._poster_fetcher = PosterFetcher()
+        return self._poster_fetcher
+
+    @staticmethod
+    def warmup():
+        """Resolve the Netflix and IMDb hostnames ahead of the first request"""
+        for host in ('www.netflix.com', 'www.imdb.com'):
+            try:
+                socket.getaddrinfo(host, 443, proto=socket.IPPROTO_TCP)
+            except OSError as e:
+                print(f"Warmup DNS lookup failed for {host}: {e}")
+
+    @staticmethod
+    def mount_pooled_adapter(session):
+        """Mount a keep-alive connection pool with retries for HTTPS on the session"""
+        adapter = HTTPAdapter(
+            pool_connections=4,
+            pool_maxsize=20,
+            max_retries=Retry(total=2, backoff_factor=0.3, status_forcelist=(502, 503, 504))
+        )
+        session.mount('https://', adapter)
+        return session
 
     def _load_cookies(self):
-        """Load cookies from cookies.txt"""
-        jar = MozillaCookieJar(self.cookies_path)
-        jar.load(ignore_discard=True, ignore_expires=True)
-        self.session.cookies = jar
+        """Load cookies from cookies.txt
+
+        The file is parsed once per (path, mtime) and each session gets its own copy of the jar.
+        """
+        self._cookies_mtime = os.stat(self.cookies_path).st_mtime
+        cached = _cookies_cache.get(self.cookies_path)
+        if cached is not None and cached[0] == self._cookies_mtime:
+            jar = cached[1]
+        else:
+            jar = MozillaCookieJar(self.cookies_path)
+            jar.load(ignore_discard=True, ignore_expires=True)
+            # Replaces the jar of any earlier version of the file
+            _cookies_cache[self.cookies_path] = (self._cookies_mtime, jar)
+        cookies = requests.cookies.RequestsCookieJar()
+        cookies.update(jar)
+        self.session.cookies = cookies
 
     def _setup_headers(self):
         """Setup realistic browser headers"""
@@ -34,7 +361,7 @@ class NetflixScraper:
             'User-Agent': 'Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36',
             'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,image/avif,image/webp,image/apng,*/*;q=0.8',
             'Accept-Language': 'en-US,en;q=0.9',
-            'Accept-Encoding': 'gzip, deflate, br',
+            'Accept-Encoding': _ACCEPT_ENCODING,
             'DNT': '1',
             'Connection': 'keep-alive',
             'Upgrade-Insecure-Requests': '1',
@@ -48,36 +375,49 @@ class NetflixScraper:
         """
         Check available formats by scraping the title page
 
+        Results are cached in-process for RESULT_CACHE_TTL seconds per title and cookies file.
+
         :param title_id: Netflix title ID
         :return: Dictionary with format information
         """
-        result = {
-            'title': None,
-            'year': None,
-            'poster': None,
-            'dolby_vision': False,
-            'hdr10': False,
-            'atmos': False,
-            'dolby_digital': False,
-            'spatial_audio': False,
-            'uhd': False,
-            '4k': False,
-            'hd': False,
-            'sdr': False,
-            'is_available': True,
-            'availability_status': 'Available',
-            'coming_date': None,
-            'is_series': False
-        }
+        if RESULT_CACHE_TTL <= 0:
+            return self._check_formats_uncached(title_id)
+
+        key = (str(title_id), self.cookies_path, self._cookies_mtime)
+        now = time.monotonic()
+        with _result_cache_lock:
+            entry = _result_cache.get(key)
+            if entry is not None and now - entry[0] < RESULT_CACHE_TTL:
+                _result_cache.move_to_end(key)
+                print(f"Using cached result for title {title_id}")
+                return dict(entry[1])
+
+        result = self._check_formats_uncached(title_id)
+
+        with _result_cache_lock:
+            _result_cache[key] = (now, dict(result))
+            _result_cache.move_to_end(key)
+            while len(_result_cache) > RESULT_CACHE_SIZE:
+                _result_cache.popitem(last=False)
+        return result
+
+    def _check_formats_uncached(self, title_id):
+        """Fetch and parse the title page (see check_formats)"""
+        result = _RESULT_TEMPLATE.copy()
+        # Per-lookup state: a reused scraper must not carry a previous title's name or year
+        self._cached_title = None
+        self._cached_year = None
 
         try:
             # Fetch the title page
             url = f"https://www.netflix.com/title/{title_id}"
             print(f"Fetching: {url}")
 
-            r = self.session.get(url, timeout=15)
-            r.raise_for_status()
-            html = r.text
+            # Streamed, so the response must be closed (returning its connection) on every path
+            with self.session.get(url, timeout=15, stream=True) as r:
+                r.raise_for_status()
+                html = self._read_title_page(r)
+            html_lower = html.lower()
 
             print(f"Response length: {len(html)} chars")
 
@@ -87,69 +427,48 @@ class NetflixScraper:
 
             # Extract title, year, and poster from various possible locations
             result['title'] = self._extract_title(html, title_id)
-            result['year'] = self._extract_year(html, title_id)
+            result['year'] = self._extract_year(html, title_id, html_lower)
 
             # Cache year for IMDb poster search (for accurate matching when multiple titles exist)
             if result['year']:
                 self._cached_year = result['year']
 
-            result['poster'] = self._extract_poster(html, title_id)
-
-            # If year was populated by IMDb fetcher, update the result
-            if hasattr(self, '_cached_year') and self._cached_year and not result['year']:
-                result['year'] = self._cached_year
-                print(f"Updated year from IMDb: {result['year']}")
+            # Start the IMDb poster lookup now, so its round-trips overlap the parsing below
+            # (title and year are passed in: the worker must not read this scraper's state,
+            # and the fetcher is built here, on the thread that owns the scraper)
+            self.poster_fetcher
+            imdb_poster = _POSTER_EXECUTOR.submit(self._fetch_poster_from_tmdb,
+                                                  self._cached_title, self._cached_year)
 
             # Extract availability and content type information
-            self._extract_availability(html, result)
-            self._extract_content_type(html, result)
+            self._extract_availability(html, html_lower, result)
+            self._extract_content_type(html_lower, result)
 
             # Method 1: Extract from embedded JSON data (most accurate)
             json_found = self._extract_from_json(html, result, title_id)
 
+            # Scan the page once for every text pattern (used by the audio scan and the fallback)
+            features = _scan_features(html_lower)
+
             # Always scan for additional audio formats (can coexist with JSON data)
-            self._detect_audio_formats(html, result)
+            self._detect_audio_formats(features, result)
 
             # Method 2: Only use text pattern matching as fallback if no JSON data found
             if not json_found:
                 print("Warning: No JSON delivery data found, using text pattern matching as fallback")
-                html_lower = html.lower()
 
                 # UHD/4K detection
-                uhd_patterns = [
-                    'ultra hd', 'ultrahd', '4k', 'uhd', '2160p',
-                    '"is4k":true', '"has4k":true', 'hasultra'
-                ]
-                result['uhd'] = any(pattern in html_lower for pattern in uhd_patterns)
+                result['uhd'] = 'uhd' in features
                 result['4k'] = result['uhd']
 
                 # HD detection (if not 4K)
                 if not result['uhd']:
-                    hd_patterns = ['1080p', '"isHd":true', 'high definition']
-                    result['hd'] = any(pattern in html_lower for pattern in hd_patterns)
-
-                # Dolby Vision detection
-                dv_patterns = [
-                    'dolby vision', 'dolbyvision', 'dolby-vision', 'vision-enabled',
-                    'profiledolbyvision', 'dovi-enabled', 'dovi', 'dvhe', 'dvh1',
-                    '"hasdolbyvision":true', 'hasdolbyvision'
-                ]
-                result['dolby_vision'] = any(pattern in html_lower for pattern in dv_patterns)
-
-                # HDR10 detection
-                hdr_patterns = [
-                    'hdr10', 'hdr-10', 'hdr 10', 'high dynamic range',
-                    'hdr-enabled', 'hdr enabled', '"hashdr":true', 'hashdr10'
-                ]
-                result['hdr10'] = any(pattern in html_lower for pattern in hdr_patterns)
-
-                # Dolby Atmos detection
-                atmos_patterns = [
-                    'dolby atmos', 'dolbyatmos', 'dolby-atmos', 'atmosenabled',
-                    'atmos-enabled', 'atmos audio', '"hasdolbyatmos":true',
-                    'hasdolbyatmos', 'hasatmos'
-                ]
-                result['atmos'] = any(pattern in html_lower for pattern in atmos_patterns)
+                    result['hd'] = 'hd' in features
+
+                # Dolby Vision, HDR10 and Dolby Atmos detection
+                result['dolby_vision'] = 'dolby_vision' in features
+                result['hdr10'] = 'hdr10' in features
+                result['atmos'] = 'atmos' in features
 
                 # SDR (Standard Dynamic Range) detection - mutually exclusive with HDR
                 # If no HDR formats detected, default to SDR being available
@@ -160,6 +479,13 @@ class NetflixScraper:
                     # No HDR detected, so SDR should be True (default for standard content)
                     result['sdr'] = True
 
+            # Poster: the background IMDb lookup first, then Netflix sources as fallback
+            result['poster'] = self._extract_poster(html, title_id, imdb_poster)
+
+            # If year was populated by IMDb fetcher, update the result
+            if self._cached_year and not result['year']:
+                result['year'] = self._cached_year
+                print(f"Updated year from IMDb: {result['year']}")
 
             print(f"Detection results: DV={result['dolby_vision']}, HDR={result['hdr10']}, Atmos={result['atmos']}, 4K={result['uhd']}")
 
@@ -172,95 +498,91 @@ class NetflixScraper:
             print(f"Error: {e}")
             raise
 
-    def _detect_audio_formats(self, html, result):
+    def _read_title_page(self, response):
+        """Read a streamed title page in chunks, stopping after PAGE_READ_LIMIT characters
+
+        The whole page is normally needed: availability and content-type text can come
+        after the delivery JSON, so reading does not stop at the first markers.
+        """
+        if response.encoding is None:
+            response.encoding = 'utf-8'
+        chunks = []
+        size = 0
+        try:
+            for chunk in response.iter_content(PAGE_CHUNK_SIZE, decode_unicode=True):
+                chunks.append(chunk)
+                size += len(chunk)
+                if size >= PAGE_READ_LIMIT:
+                    print(f"Title page exceeds {PAGE_READ_LIMIT} chars, ignoring the rest")
+                    break
+        finally:
+            response.close()
+        return ''.join(chunks)
+
+    def _detect_audio_formats(self, features, result):
         """Detect additional audio formats from page content
 
         Only updates if not already set by JSON extraction (JSON is more reliable)
-        """
-        html_lower = html.lower()
 
+        :param features: Feature names found by _scan_features()
+        """
         # Look for Dolby Digital (5.1 Dolby) mentions
         # Only update if not already detected from JSON
         if not result.get('dolby_digital'):
-            dolby_digital_patterns = [
-                'dolby digital',
-                'dolby-digital',
-                'ac-3',
-                'ac3',
-                '5.1',
-                '5.1 dolby'
-            ]
-            result['dolby_digital'] = any(pattern in html_lower for pattern in dolby_digital_patterns)
+            result['dolby_digital'] = 'dolby_digital' in features
 
         # Look for Spatial Audio
         # Only update if not already detected from JSON
         if not result.get('spatial_audio'):
-            spatial_audio_patterns = [
-                'spatial audio',
-                'spatial-audio'
-            ]
-            result['spatial_audio'] = any(pattern in html_lower for pattern in spatial_audio_patterns)
+            result['spatial_audio'] = 'spatial_audio' in features
 
     def _extract_title(self, html, title_id):
         """Extract title name from HTML"""
-        def decode_title(title_str):
-            """Decode escaped characters in title"""
-            # Replace \x20 with space and other common escapes
-            title_str = title_str.replace('\\x20', ' ')
-            title_str = title_str.replace('\\x27', "'")
-            title_str = title_str.replace('\\x26', '&')
-            # Use codecs to handle any remaining hex escapes
-            try:
-                # Encode to bytes and decode to handle unicode escapes
-                import codecs
-                title_str = codecs.decode(title_str, 'unicode_escape')
-            except:
-                pass
-            return title_str.strip()
-
         # Try og:title meta tag
-        match = re.search(r'<meta property="og:title" content="([^"]+)"', html)
+        match = _RE_OG_TITLE.search(html)
         if match:
             title = match.group(1).replace(' | Netflix', '').strip()
             if title and title != 'Netflix':
-                decoded = decode_title(title)
+                decoded = _decode_title(title)
                 self._cached_title = decoded
                 return decoded
 
         # Try title tag
-        match = re.search(r'<title[^>]*>([^<]+)</title>', html)
+        match = _RE_TITLE_TAG.search(html)
         if match:
             title = match.group(1).replace(' | Netflix', '').strip()
             if title and title != 'Netflix':
-                decoded = decode_title(title)
+                decoded = _decode_title(title)
                 self._cached_title = decoded
                 return decoded
 
+        patterns = _title_id_patterns(title_id)
+
         # Try to find title in JSON with better patterns
         # Look for title field near the title ID (most accurate)
-        match = re.search(rf'{title_id}[^}}{{]{{0,200}}?"title":\s*"([^"]+)"', html)
+        match = patterns['title'].search(html)
         if match:
             title = match.group(1)
             if title and len(title) > 2 and title not in ['Netflix', 'Shows', 'Movies', 'My List']:
-                decoded = decode_title(title)
+                decoded = _decode_title(title)
                 self._cached_title = decoded
                 return decoded
 
         # Look for "name" field near the title ID
-        match = re.search(rf'{title_id}[^}}{{]{{0,200}}?"name":\s*"([^"]+)"', html)
+        match = patterns['name'].search(html)
         if match:
             title = match.group(1)
             if title and len(title) > 2 and title not in ['Netflix', 'Shows', 'Movies', 'My List']:
-                decoded = decode_title(title)
+                decoded = _decode_title(title)
                 self._cached_title = decoded
                 return decoded
 
         # Try looking for video title with the ID as key
-        match = re.search(rf'"{title_id}":\s*{{[^}}]{{0,500}}?"title":\s*"([^"]+)"', html)
+        match = patterns['keyed_title'].search(html)
         if match:
             title = match.group(1)
             if title and len(title) > 2 and title not in ['Netflix', 'Shows', 'Movies', 'My List']:
-                decoded = decode_title(title)
+                decoded = _decode_title(title)
                 self._cached_title = decoded  # Cache for TMDB fallback
                 return decoded
 
@@ -268,72 +590,40 @@ class NetflixScraper:
         self._cached_title = None
         return None
 
-    def _extract_year(self, html, title_id=None):
+    def _extract_year(self, html, title_id=None, html_lower=None):
         """Extract release year from HTML, preferring most reliable sources first"""
         try:
             # Priority 0: Try to extract year near the actual title name (most reliable for collection pages)
             # This handles cases where Netflix pages show multiple titles with different release years
             if hasattr(self, '_cached_title') and self._cached_title:
-                title = self._cached_title
-                # Escape special regex characters in title
-                escaped_title = re.escape(title)
-
-                # Look for "title":"EXACT_TITLE" followed by releaseYear within 500 chars
-                # Use a broader search window for better accuracy
-                pattern = rf'"title"\s*:\s*"{escaped_title}"[^}}{{]*"releaseYear"\s*(?:\{{"?\$type"?:?"atom",?"?value"?:)?(\d{{4}})'
-                matches = list(re.finditer(pattern, html, re.IGNORECASE | re.DOTALL))
-                if matches:
-                    # Use the last match (most likely to be the main title when page shows related titles)
-                    year = int(matches[-1].group(1))
+                year = self._find_title_release_year(html_lower if html_lower is not None else html.lower(),
+                                                     self._cached_title)
+                if year:
                     print(f"Found year from title-matched releaseYear: {year}")
                     return year
 
-            # Priority 1: Try JSON-LD dateCreated (Netflix) - MOST RELIABLE
-            # Format: "dateCreated": "2025-11-13"
-            # This is the JSON-LD schema that Netflix provides
-            match = re.search(r'"dateCreated"\s*:\s*"(\d{4})-', html)
-            if match:
-                year = int(match.group(1))
-                print(f"Found year from JSON-LD dateCreated: {year}")
-                return year
-
-            # Priority 2: Try span.year pattern (from Netflix HTML display)
-            # Pattern: <span class="year">(YYYY)</span>
-            match = re.search(r'<span class="year">\((\d{4})\)</span>', html)
-            if match:
-                year = int(match.group(1))
-                print(f"Found year from HTML: {year}")
-                return year
-
-            # Priority 3: Try JSON pattern: "releaseYear": YYYY (general search, get the LAST match)
-            # When multiple titles are shown on a page, the last releaseYear is usually the main title
-            matches = list(re.finditer(r'"releaseYear"\s*(?:\{{"?\$type"?:?"atom",?"?value"?:)?(\d{4})', html))
-            if matches:
-                year = int(matches[-1].group(1))
-                print(f"Found year from last releaseYear match: {year}")
-                return year
-
-            # Priority 4: Try pattern: "productionYear": YYYY
-            match = re.search(r'"productionYear":\s*(\d{4})', html)
-            if match:
-                year = int(match.group(1))
-                print(f"Found year from productionYear: {year}")
-                return year
-
-            # Priority 5: Try meta tags
-            match = re.search(r'<meta\s+property="og:title"\s+content="[^"]*\((\d{4})\)"', html)
-            if match:
-                year = int(match.group(1))
-                print(f"Found year from og:title: {year}")
-                return year
+            # Priorities 1-6 in a single pass (first match of each kind, last match for releaseYear):
+            # 1. JSON-LD dateCreated (Netflix) - MOST RELIABLE, e.g. "dateCreated": "2025-11-13"
+            # 2. span.year pattern (from Netflix HTML display): <span class="year">(YYYY)</span>
+            # 3. "releaseYear": YYYY - when multiple titles are shown, the last one is usually the main title
+            # 4. "productionYear": YYYY
+            # 5. og:title meta tag
+            # 6. "year" pattern (generic, lower priority because can match currency data)
+            found = {}
+            for match in _RE_YEAR_ANY.finditer(html):
+                kind = match.lastgroup
+                if kind == 'date_created':
+                    found[kind] = match
+                    break
+                if kind == 'release_year' or kind not in found:
+                    found[kind] = match
 
-            # Priority 6: "year" pattern (generic, lower priority because can match currency data)
-            # Only use if no other patterns matched
-            match = re.search(r'"year":\s*(\d{4})', html)
-            if match:
-                year = int(match.group(1))
-                print(f"Found year from generic year field: {year}")
-                return year
+            for kind, regex, source in _YEAR_SOURCES:
+                match = found.get(kind)
+                if match:
+                    year = int(match.group(match.lastindex + 1))
+                    print(f"Found year from {source}: {year}")
+                    return year
 
             return None
         except Exception as e:
@@ -342,9 +632,39 @@ class NetflixScraper:
             traceback.print_exc()
             return None
 
-    def _extract_poster(self, html, title_id=None):
+    def _find_title_release_year(self, html_lower, title):
+        """Find the releaseYear in the same JSON object as "title":"<title>"
+
+        Locates each quoted occurrence of the title with str.find, checks it is the value
+        of a "title" key, then searches only up to the next brace for "releaseYear".
+        Returns the year from the last such occurrence (most likely the main title when
+        the page shows related titles), or None.
+        """
+        needle = f'"{title.lower()}"'
+        year = None
+        hit = html_lower.find(needle)
+        while hit != -1:
+            if _RE_TITLE_KEY_BEFORE.search(html_lower, max(0, hit - 64), hit):
+                start = hit + len(needle)
+                brace = _RE_BRACE.search(html_lower, start)
+                end = brace.start() if brace else len(html_lower)
+                # "releaseYear" must begin before the next brace (its atom form may open one)
+                last = None
+                for match in _RE_TITLE_RELEASE_YEAR.finditer(html_lower, start, end + 80):
+                    if match.start() >= end:
+                        break
+                    last = match
+                if last:
+                    year = int(last.group(1))
+            hit = html_lower.find(needle, hit + 1)
+        return year
+
+    def _extract_poster(self, html, title_id=None, imdb_poster=None):
         """Extract poster image URL from HTML
 
+        :param imdb_poster: Optional Future of an already started _fetch_poster_from_tmdb() call;
+                            waited on for at most IMDB_POSTER_TIMEOUT seconds
+
         IMPORTANT NOTE: Priority order is based on RELIABILITY, not speed.
         IMDb is most reliable (Priority 0) because Netflix metadata often points to wrong posters.
         Netflix sources are fallback only (Priority 1-5).
@@ -361,25 +681,32 @@ class NetflixScraper:
         # Netflix sources have proven to be unreliable (e.g., returning wrong posters)
         # Using IMDb web scraping which is more accurate
         print("Trying IMDb poster extraction (Priority 0 - PREFERRED)...")
-        imdb_poster = self._fetch_poster_from_tmdb()
+        if imdb_poster is not None:
+            try:
+                imdb_poster, imdb_year = imdb_poster.result(timeout=IMDB_POSTER_TIMEOUT)
+            except PosterTimeout:
+                print(f"IMDb poster lookup took longer than {IMDB_POSTER_TIMEOUT}s, skipping it")
+                imdb_poster, imdb_year = None, None
+        else:
+            imdb_poster, imdb_year = self._fetch_poster_from_tmdb(self._cached_title, self._cached_year)
+
+        # If IMDb provided a year and we don't have one from Netflix, cache it
+        if imdb_year and not self._cached_year:
+            self._cached_year = imdb_year
+
         if imdb_poster:
             print(f"Found IMDb poster (Priority 0 - PREFERRED SOURCE)")
             return imdb_poster
 
+        # The boxArt patterns below all start with the quoted title ID, so find it once:
+        # skip them entirely if it is absent, otherwise start scanning from its first occurrence
+        title_id_pos = html.find(f'"{title_id}"') if title_id else -1
+
         # Priority 1: Look for boxArt with poster dimensions (342w, 500w, 600w)
         # These are specifically sized for poster display
-        if title_id:
-            poster_dimension_patterns = [
-                # boxArt with 342w (standard poster width)
-                rf'"{title_id}"[^{{]*{{[^}}]*"boxArt"[^{{]*{{[^}}]*"342w":\s*"([^"]+)"',
-                # boxArt with 500w
-                rf'"{title_id}"[^{{]*{{[^}}]*"boxArt"[^{{]*{{[^}}]*"500w":\s*"([^"]+)"',
-                # boxArt with 600w
-                rf'"{title_id}"[^{{]*{{[^}}]*"boxArt"[^{{]*{{[^}}]*"600w":\s*"([^"]+)"',
-            ]
-
-            for pattern in poster_dimension_patterns:
-                match = re.search(pattern, html)
+        if title_id_pos != -1:
+            for pattern in _title_id_patterns(title_id)['poster_dimensions']:
+                match = pattern.search(html, title_id_pos)
                 if match:
                     url = decode_url(match.group(1))
                     if url and ('nflx' in url.lower() or 'occ-' in url):
@@ -387,16 +714,9 @@ class NetflixScraper:
                         return url
 
         # Priority 2: Look for generic boxArt with url field
-        if title_id:
-            box_patterns = [
-                # Generic boxArt pattern near title ID
-                rf'"{title_id}"[^{{]*{{[^}}]*"boxArt"[^{{]*{{[^}}]*"url":\s*"([^"]+)"',
-                # Alternative: look in broader context
-                rf'"{title_id}"[^}}]{{0,500}}"boxArt"[^}}]{{0,200}}"url":\s*"([^"]+)"'
-            ]
-
-            for pattern in box_patterns:
-                match = re.search(pattern, html)
+        if title_id_pos != -1:
+            for pattern in _title_id_patterns(title_id)['box']:
+                match = pattern.search(html, title_id_pos)
                 if match:
                     url = decode_url(match.group(1))
                     if url and ('nflx' in url.lower() or 'occ-' in url):
@@ -405,7 +725,7 @@ class NetflixScraper:
 
         # Priority 3: Try og:image meta tag (usually the large poster)
         # But validate it's from Netflix CDN
-        match = re.search(r'<meta property="og:image" content="([^"]+)"', html)
+        match = _RE_OG_IMAGE.search(html)
         if match:
             url = decode_url(match.group(1))
             # Strict validation: must be from Netflix CDN
@@ -414,7 +734,7 @@ class NetflixScraper:
                 return url
 
         # Priority 4: Try twitter:image
-        match = re.search(r'<meta name="twitter:image" content="([^"]+)"', html)
+        match = _RE_TWITTER_IMAGE.search(html)
         if match:
             url = decode_url(match.group(1))
             if url and ('nflx' in url.lower() or 'occ-' in url):
@@ -422,15 +742,8 @@ class NetflixScraper:
                 return url
 
         # Priority 5: Fallback to find any other boxshot or poster URLs in JSON
-        patterns = [
-            r'"boxshot":\s*"([^"]+)"',
-            r'"poster":\s*"([^"]+)"',
-            r'"image":\s*"(https://[^"]*nflximg[^"]+)"',
-            r'"url":\s*"(https://[^"]*occ-\d+-\d+\.nflxso[^"]+)"'
-        ]
-
-        for pattern in patterns:
-            match = re.search(pattern, html)
+        for pattern in _GENERIC_POSTER_PATTERNS:
+            match = pattern.search(html)
             if match:
                 url = decode_url(match.group(1))
                 if url and ('nflx' in url.lower() or 'occ-' in url):
@@ -441,7 +754,7 @@ class NetflixScraper:
         print("No poster found from any source")
         return None
 
-    def _fetch_poster_from_tmdb(self):
+    def _fetch_poster_from_tmdb(self, title, netflix_year=None):
         """
         Fetch poster from IMDb using web scraping.
 
@@ -453,21 +766,21 @@ class NetflixScraper:
         when multiple titles with the same name exist on IMDb.
         Also extracts correct year from IMDb if not available from Netflix.
 
-        :return: Poster URL from IMDb or None
+        Safe to run on another thread: it only reads its arguments and the poster fetcher.
+
+        :param title: Title name extracted from the Netflix page
+        :param netflix_year: Release year from Netflix metadata, if known
+        :return: (poster URL or None, year found on IMDb when no year was known, else None)
         """
         try:
-            if not hasattr(self, '_cached_title'):
-                return None
-
-            title = self._cached_title
             if not title:
-                return None
+                return None, None
 
             # Try to extract year if present in title
             clean_title, year_from_title = extract_year_from_title(title)
 
             # Use year from Netflix metadata if available, otherwise from title
-            year = getattr(self, '_cached_year', None) or year_from_title
+            year = netflix_year or year_from_title
 
             if year:
                 print(f"IMDb search: '{clean_title}' ({year})")
@@ -479,11 +792,11 @@ class NetflixScraper:
             if poster_info:
                 poster_url = poster_info.get('poster_url')
 
-                # If IMDb provided a year and we don't have one from Netflix, cache it
+                # If IMDb provided a year and we don't have one, hand it back to the caller
+                imdb_year = None
                 if not year and poster_info.get('year'):
                     imdb_year = poster_info.get('year')
                     print(f"Extracted year {imdb_year} from IMDb")
-                    self._cached_year = imdb_year
                     year = imdb_year
 
                 if year:
@@ -491,61 +804,42 @@ class NetflixScraper:
                 else:
                     print(f"Found poster for '{title}' from IMDb")
 
-                return poster_url
+                return poster_url, imdb_year
 
-            return None
+            return None, None
         except Exception as e:
             print(f"IMDb poster fetch failed: {e}")
             import traceback
             traceback.print_exc()
-            return None
+            return None, None
 
     def _extract_from_json(self, html, result, title_id):
         """Extract format info from embedded JSON data"""
         try:
             # Look for the delivery object near the title ID
-            # Find all delivery objects and pick the one associated with this title
-            delivery_pattern = r'"delivery":\s*\{("has[^}]+)\}'
-            matches = re.finditer(delivery_pattern, html)
+            for delivery in _iter_title_deliveries(html, title_id):
+                # Extract format information from delivery object
+                result['uhd'] = delivery.get('hasUltraHD', False)
+                result['4k'] = result['uhd']
+                result['hd'] = delivery.get('hasHD', False)
+                result['dolby_vision'] = delivery.get('hasDolbyVision', False)
+                result['hdr10'] = delivery.get('hasHDR', False)
+                result['atmos'] = delivery.get('hasDolbyAtmos', False)
+                result['spatial_audio'] = delivery.get('hasAudioSpatial', False)
+                result['dolby_digital'] = delivery.get('has51Audio', False)
+
+                # SDR (Standard Dynamic Range) and HDR are mutually exclusive
+                # If the title has any HDR format, it should NOT have SDR
+                # If it has no HDR formats, then SDR should be True (default assumption for standard content)
+                has_hdr = result['hdr10'] or result['dolby_vision']
+                if has_hdr:
+                    result['sdr'] = False  # HDR means no SDR
+                else:
+                    # No HDR detected, so default SDR to True (override Netflix's potentially unreliable hasSD)
+                    result['sdr'] = True
 
-            for match in matches:
-                delivery_str = '{' + match.group(1) + '}'
-                try:
-                    delivery = json.loads(delivery_str)
-
-                    # Check if this delivery object is near our title ID
-                    # Extract context around this match to verify it's for our title
-                    match_pos = match.start()
-                    context_start = max(0, match_pos - 1000)
-                    context = html[context_start:match_pos]
-
-                    # If we find the title ID in the context, this is our delivery object
-                    if f'"{title_id}"' in context:
-                        # Extract format information from delivery object
-                        result['uhd'] = delivery.get('hasUltraHD', False)
-                        result['4k'] = result['uhd']
-                        result['hd'] = delivery.get('hasHD', False)
-                        result['dolby_vision'] = delivery.get('hasDolbyVision', False)
-                        result['hdr10'] = delivery.get('hasHDR', False)
-                        result['atmos'] = delivery.get('hasDolbyAtmos', False)
-                        result['spatial_audio'] = delivery.get('hasAudioSpatial', False)
-                        result['dolby_digital'] = delivery.get('has51Audio', False)
-
-                        # SDR (Standard Dynamic Range) and HDR are mutually exclusive
-                        # If the title has any HDR format, it should NOT have SDR
-                        # If it has no HDR formats, then SDR should be True (default assumption for standard content)
-                        has_hdr = result['hdr10'] or result['dolby_vision']
-                        if has_hdr:
-                            result['sdr'] = False  # HDR means no SDR
-                        else:
-                            # No HDR detected, so default SDR to True (override Netflix's potentially unreliable hasSD)
-                            result['sdr'] = True
-
-                        print(f"Found delivery data: UHD={result['uhd']}, HD={result['hd']}, SDR={result['sdr']}, DV={result['dolby_vision']}, HDR={result['hdr10']}, Atmos={result['atmos']}, Spatial={result['spatial_audio']}, 5.1={result['dolby_digital']}")
-                        return True
-
-                except json.JSONDecodeError:
-                    continue
+                print(f"Found delivery data: UHD={result['uhd']}, HD={result['hd']}, SDR={result['sdr']}, DV={result['dolby_vision']}, HDR={result['hdr10']}, Atmos={result['atmos']}, Spatial={result['spatial_audio']}, 5.1={result['dolby_digital']}")
+                return True
 
             return False
 
@@ -553,7 +847,7 @@ class NetflixScraper:
             print(f"JSON extraction error: {e}")
             return False
 
-    def _extract_availability(self, html, result):
+    def _extract_availability(self, html, html_lower, result):
         """Extract availability status and coming date from HTML
 
         Detects if content is currently available or coming soon.
@@ -563,90 +857,55 @@ class NetflixScraper:
         - coming_date: str or None (formatted date if coming soon)
         """
         try:
-            # Look for "Coming Soon" patterns
-            coming_patterns = [
-                r'coming\s+soon',
-                r'coming\s+([A-Za-z]+\s+\d+)',
-                r'join\s+us\s+on\s+(\w+\s+\d+)',
-                r'streaming\s+from\s+([A-Za-z]+\s+\d+)',
-                r'available\s+([A-Za-z]+\s+\d+)',
-                r'arrives?\s+([A-Za-z]+\s+\d+)',
-            ]
-
-            html_lower = html.lower()
+            # Check for coming soon indicators: one pass, keeping the first match of each pattern
+            found = {}
+            for match in _RE_COMING.finditer(html_lower):
+                found.setdefault(match.lastgroup, match)
+                if match.lastgroup == 'c0':
+                    break
 
-            # Check for coming soon indicators
-            for pattern in coming_patterns:
-                match = re.search(pattern, html_lower, re.IGNORECASE)
+            for i in range(len(_COMING_PATTERNS)):
+                match = found.get(f'c{i}')
                 if match:
                     result['is_available'] = False
                     result['availability_status'] = 'Coming Soon'
 
                     # Try to extract the date
-                    if len(match.groups()) > 0:
-                        result['coming_date'] = match.group(1)
+                    if i > 0:
+                        result['coming_date'] = match.group(match.lastindex + 1)
                     else:
                         # Look for date patterns near "coming soon"
-                        date_match = re.search(r'([A-Za-z]+\s+\d{1,2},?\s+\d{4})', html[max(0, match.start()-200):match.end()+200])
+                        date_match = _RE_COMING_DATE.search(html[max(0, match.start()-200):match.end()+200])
                         if date_match:
                             result['coming_date'] = date_match.group(1)
                     break
 
             # Look for "Available" or "Streaming Now" patterns
-            if result['is_available']:
-                available_patterns = [
-                    r'streaming\s+now',
-                    r'watch\s+now',
-                    r'available\s+now',
-                ]
-
-                for pattern in available_patterns:
-                    if re.search(pattern, html_lower, re.IGNORECASE):
-                        result['is_available'] = True
-                        result['availability_status'] = 'Available'
-                        break
+            if result['is_available'] and _RE_AVAILABLE.search(html_lower):
+                result['is_available'] = True
+                result['availability_status'] = 'Available'
 
         except Exception as e:
             print(f"Availability extraction error: {e}")
             # Keep defaults: is_available=True, availability_status='Available'
 
-    def _extract_content_type(self, html, result):
-        """Extract content type (Movie vs. TV Series) from HTML
+    def _extract_content_type(self, html_lower, result):
+        """Extract content type (Movie vs. TV Series) from the lowercased HTML
 
         Updates result dictionary with:
         - is_series: bool (True if TV Series, False if Movie)
         """
         try:
-            html_lower = html.lower()
-
-            # Look for series indicators
-            series_patterns = [
-                r'"type"\s*:\s*"series"',
-                r'"isshow"\s*:\s*true',
-                r'tvshow',
-                r'tv series',
-                r'seasons?',
-                r'episodes?',
-                r'"contenttype"\s*:\s*"series"',
-            ]
-
-            # Check for movie indicators (higher priority)
-            movie_patterns = [
-                r'"type"\s*:\s*"movie"',
-                r'"type"\s*:\s*"film"',
-                r'"isshow"\s*:\s*false',
-                r'"contenttype"\s*:\s*"movie"',
-            ]
-
             # Check movie first
-            for pattern in movie_patterns:
-                if re.search(pattern, html, re.IGNORECASE):
+            # The literal check (str.find) skips the regex when it cannot match
+            for literal, pattern in _MOVIE_PATTERNS:
+                if literal in html_lower and pattern.search(html_lower):
                     result['is_series'] = False
                     return
 
             # Then check for series
-            for pattern in series_patterns:
-                if re.search(pattern, html, re.IGNORECASE):
+            for literal, pattern in _SERIES_PATTERNS:
+                if literal in html_lower and (pattern is None or pattern.search(html_lower)):
                     result['is_series'] = True
                     return
 
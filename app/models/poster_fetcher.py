@@ -5,14 +5,94 @@ Uses web scraping from IMDb and fallbacks for poster extraction
 Provides fallback mechanism for failed Netflix poster extraction
 """
 
+import os
+import time
+import threading
+import orjson
 import requests
+from requests.adapters import HTTPAdapter
+from requests.utils import DEFAULT_ACCEPT_ENCODING
+from urllib3.util.retry import Retry
 import logging
-from typing import Optional
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Optional, Pattern, Tuple
 import re
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
 from urllib.parse import quote
 
+try:
+    import diskcache
+except ImportError:  # Optional: only the in-memory cache is used
+    diskcache = None
+
 logger = logging.getLogger("PosterFetcher")
 
+# IMDb pages are cached by URL, in memory (shared by all fetchers) and on disk when diskcache is installed.
+# Title pages are around 1 MB each, so the in-memory copy is capped by total size per process
+# and the disk copy by total size on disk (diskcache evicts the least recently stored first).
+IMDB_CACHE_TTL = 24 * 3600
+IMDB_MEMORY_CACHE_BYTES = 8 * 1024 * 1024
+IMDB_CACHE_DIR = os.path.join('.cache', 'imdb')
+IMDB_DISK_CACHE_BYTES = 256 * 1024 * 1024
+
+IMDB_STREAM_CHUNK_SIZE = 64 * 1024
+IMDB_STREAM_OVERLAP = 4096
+
+# Seconds to wait for the suggestion API before also starting the HTML lookup, and
+# for both backends together before giving up. Each concurrent lookup (LOOKUP_WORKERS,
+# as in app.routes) may run both backends at once, so the pool has two workers per lookup.
+IMDB_HEDGE_DELAY = 0.5
+IMDB_LOOKUP_DEADLINE = 8
+_backend_executor = ThreadPoolExecutor(max_workers=2 * int(os.environ.get('LOOKUP_WORKERS', 32)),
+                                       thread_name_prefix='imdb-backend')
+
+IMDB_SUGGEST_URL = 'https://v2.sg.media-imdb.com/suggestion/{first}/{query}.json'
+
+# IMDb page patterns, matched against the raw response bytes (no decode needed)
+_RE_IMDB_ID = re.compile(rb'/title/(tt\d+)/')
+_RE_POSTER = re.compile(rb'"image"\s*:\s*\{"url"\s*:\s*"([^"]*amazon[^"]*\.jpg)')
+_RE_AMAZON_IMAGE = re.compile(rb'https://m\.media-amazon\.com/images/[^"]*\.jpg')
+_RE_SEARCH_RESULT_YEAR = re.compile(rb'/title/(tt\d+)/[^>]*>([^<]+)</a>\s*\((\d{4})\)')
+# Year sources in priority order, scanned together in one pass
+_YEAR_PATTERNS = (
+    ('release_year', rb'"releaseYear"\s*:\s*(\d{4})'),
+    ('date_published', rb'"datePublished"\s*:\s*"(\d{4})'),
+    ('birth_date', rb'"birthDate"\s*:\s*"(\d{4})'),
+    ('span', rb'<span>(\d{4})</span>'),
+)
+_RE_YEAR_ANY = re.compile(b'|'.join(b'(?P<%s>%s)' % (name.encode(), pattern) for name, pattern in _YEAR_PATTERNS))
+_RE_TITLE_YEAR = re.compile(r'\((\d{4})\)$')
+
+_page_cache = OrderedDict()
+_page_cache_bytes = 0
+_page_cache_lock = threading.Lock()
+_disk_cache = None
+
+
+def _get_disk_cache():
+    """Open the on-disk page cache on first use (None without diskcache)
+
+    Opened under the page cache lock, so concurrent backends share one Cache.
+    """
+    global _disk_cache
+    if _disk_cache is None and diskcache is not None:
+        with _page_cache_lock:
+            if _disk_cache is None:
+                try:
+                    _disk_cache = diskcache.Cache(IMDB_CACHE_DIR, size_limit=IMDB_DISK_CACHE_BYTES)
+                except Exception as e:
+                    logger.debug(f"Disk cache unavailable: {e}")
+    return _disk_cache
+
+
+@dataclass
+class ImdbHit:
+    """Poster and year found on one IMDb title page"""
+    poster_url: Optional[str]
+    year: Optional[int]
+    imdb_id: str
+
 
 class PosterFetcher:
     """Fetch movie/TV show posters from various sources"""
@@ -25,8 +105,18 @@ class PosterFetcher:
         """
         self.timeout = timeout
         self.session = requests.Session()
+        # Keep-alive pool shared by the concurrent IMDb backends (see _fetch_from_imdb)
+        adapter = HTTPAdapter(
+            pool_connections=32,
+            pool_maxsize=64,
+            max_retries=Retry(total=2, backoff_factor=0.3, status_forcelist=(502, 503, 504))
+        )
+        self.session.mount('https://', adapter)
+        self.session.mount('http://', adapter)
         self.session.headers.update({
-            'User-Agent': 'Mozilla/5.0 (X11; Linux x86_64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36'
+            'User-Agent': 'Mozilla/5.0 (X11; Linux x86_64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36',
+            # gzip/deflate, plus br when a brotli package is installed
+            'Accept-Encoding': DEFAULT_ACCEPT_ENCODING,
         })
 
     def fetch_poster(self, title: str, year: Optional[int] = None) -> Optional[str]:
@@ -37,16 +127,29 @@ class PosterFetcher:
         :param year: Optional release year for better matching
         :return: Full poster URL or None if not found
         """
+        hit = self._fetch_hit(title, year, need_year=False)
+        return hit.poster_url if hit else None
+
+    def _fetch_hit(self, title: str, year: Optional[int] = None,
+                   need_year: bool = True) -> Optional[ImdbHit]:
+        """
+        Look up a title's poster (and year) using multiple sources
+
+        :param title: Movie/TV show title
+        :param year: Optional release year for better matching
+        :param need_year: Whether the caller uses hit.year (see _fetch_from_imdb)
+        :return: ImdbHit with a poster URL, or None if not found
+        """
         if not title or not title.strip():
             logger.debug("Empty title provided")
             return None
 
         try:
             # Try IMDb first (more reliable)
-            poster_url = self._fetch_from_imdb(title, year)
-            if poster_url:
+            hit = self._fetch_from_imdb(title, year, need_year)
+            if hit:
                 logger.info(f"Found poster for '{title}' from IMDb")
-                return poster_url
+                return hit
 
             logger.debug(f"Could not find poster for '{title}' in any source")
             return None
@@ -55,13 +158,128 @@ class PosterFetcher:
             logger.warning(f"Poster fetch failed for '{title}': {e}")
             return None
 
-    def _fetch_from_imdb(self, title: str, year: Optional[int] = None) -> Optional[str]:
+    def _get_cached(self, url: str, stop_at: Optional[Pattern] = None,
+                    cancel: Optional[threading.Event] = None) -> bytes:
+        """
+        GET a page and return its raw body, using the in-memory and on-disk caches
+
+        :param url: Page URL
+        :param stop_at: Optional bytes pattern; on a cache miss the body is streamed and reading
+                        stops once it matches (such partial pages are not cached)
+        :param cancel: Optional event; on a cache miss the body is streamed and reading stops
+                       once it is set (the partial page is returned, and not cached)
+        :return: Response body (undecoded)
+        """
+        global _page_cache_bytes
+        now = time.time()
+        with _page_cache_lock:
+            entry = _page_cache.get(url)
+            if entry is not None and now - entry[0] < IMDB_CACHE_TTL:
+                _page_cache.move_to_end(url)
+                return entry[1]
+
+        disk = _get_disk_cache()
+        body = disk.get(url) if disk is not None else None
+        if not isinstance(body, bytes):  # Also skips text entries written by older versions
+            if stop_at is not None or cancel is not None:
+                body, complete = self._read_until(url, stop_at, cancel)
+                if not complete:
+                    return body
+            else:
+                response = self.session.get(url, timeout=self.timeout)
+                response.raise_for_status()
+                body = response.content
+            if disk is not None:
+                disk.set(url, body, expire=IMDB_CACHE_TTL)
+
+        with _page_cache_lock:
+            stale = _page_cache.pop(url, None)
+            if stale is not None:
+                _page_cache_bytes -= len(stale[1])
+            if len(body) <= IMDB_MEMORY_CACHE_BYTES:
+                _page_cache[url] = (now, body)
+                _page_cache_bytes += len(body)
+                while _page_cache_bytes > IMDB_MEMORY_CACHE_BYTES:
+                    _, (_, evicted) = _page_cache.popitem(last=False)
+                    _page_cache_bytes -= len(evicted)
+        return body
+
+    def _read_until(self, url: str, pattern: Optional[Pattern],
+                    cancel: Optional[threading.Event] = None) -> Tuple[bytes, bool]:
+        """
+        Stream a page and stop reading as soon as pattern matches (or cancel is set)
+
+        :param url: Page URL
+        :param pattern: Optional bytes pattern to look for in the body read so far
+        :param cancel: Optional event checked between chunks
+        :return: Tuple of (body read, whether the whole page was read)
+        """
+        with self.session.get(url, timeout=self.timeout, stream=True) as response:
+            response.raise_for_status()
+            body = bytearray()
+            for chunk in response.iter_content(IMDB_STREAM_CHUNK_SIZE):
+                if cancel is not None and cancel.is_set():
+                    return bytes(body), False
+                start = max(0, len(body) - IMDB_STREAM_OVERLAP)
+                body += chunk
+                # Only rescan the new bytes plus enough overlap for a match split across chunks
+                if pattern is not None and pattern.search(body, start):
+                    return bytes(body), False
+            return bytes(body), True
+
+    def _fetch_from_imdb(self, title: str, year: Optional[int] = None,
+                         need_year: bool = True) -> Optional[ImdbHit]:
         """
         Fetch poster from IMDb using IMDb search with year filtering
 
+        The release year is read from the same title page, so callers that also need
+        the year do not have to fetch it again.
+
+        :param title: Movie/TV show title
+        :param year: Optional release year (for accurate matching when multiple titles exist)
+        :param need_year: When False, stop reading the title page at the poster (hit.year may be None)
+        :return: ImdbHit with the poster URL, or None if no poster was found
+        """
+        # The suggestion API returns id, year and poster in one small JSON response, so it
+        # goes first. If it has not answered within IMDB_HEDGE_DELAY, the HTML lookup is
+        # started alongside it and whichever finds a poster first wins. The loser is
+        # cancelled (or told to stop reading), and nothing waits past IMDB_LOOKUP_DEADLINE.
+        deadline = time.monotonic() + IMDB_LOOKUP_DEADLINE
+        cancel = threading.Event()
+        pending = {_backend_executor.submit(self._fetch_from_imdb_suggest, title, year)}
+        try:
+            done, pending = wait(pending, timeout=IMDB_HEDGE_DELAY)
+            hit = next((future.result() for future in done if future.result()), None)
+            if hit:
+                return hit
+
+            pending.add(_backend_executor.submit(self._fetch_from_imdb_html, title, year, need_year, cancel))
+            while pending:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    logger.debug(f"IMDb lookup for '{title}' passed its {IMDB_LOOKUP_DEADLINE}s deadline")
+                    return None
+                done, pending = wait(pending, timeout=remaining, return_when=FIRST_COMPLETED)
+                hit = next((future.result() for future in done if future.result()), None)
+                if hit:
+                    return hit
+            return None
+        finally:
+            cancel.set()
+            for future in pending:
+                future.cancel()
+
+    def _fetch_from_imdb_html(self, title: str, year: Optional[int] = None,
+                              need_year: bool = True,
+                              cancel: Optional[threading.Event] = None) -> Optional[ImdbHit]:
+        """
+        Fetch poster from the IMDb search and title HTML pages (see _fetch_from_imdb)
+
         :param title: Movie/TV show title
         :param year: Optional release year (for accurate matching when multiple titles exist)
-        :return: Poster URL or None
+        :param need_year: When False, stop reading the title page at the poster (hit.year may be None)
+        :param cancel: Optional event; once set, page reads stop and None is returned
+        :return: ImdbHit with the poster URL, or None if no poster was found
         """
         try:
             # Build search query
@@ -72,56 +290,54 @@ class PosterFetcher:
             # Use IMDb search URL
             search_url = f"https://www.imdb.com/find?q={quote(query)}&s=tt"
 
-            response = self.session.get(search_url, timeout=self.timeout)
-            response.raise_for_status()
+            search_html = self._get_cached(search_url, cancel=cancel)
+            if cancel is not None and cancel.is_set():
+                return None
 
             # Extract IMDb IDs and years from search results
             # Look for pattern: /title/(tt\d+)/ with year info
             if year:
                 # When year is provided, try to find matching result with that year
-                imdb_id = self._find_matching_result_by_year(response.text, year)
+                imdb_id = self._find_matching_result_by_year(search_html, year)
                 if not imdb_id:
                     # Fallback: use first result if year-specific match not found
-                    match = re.search(r'/title/(tt\d+)/', response.text)
+                    match = _RE_IMDB_ID.search(search_html)
                     if match:
-                        imdb_id = match.group(1)
+                        imdb_id = match.group(1).decode('ascii')
                     else:
                         return None
             else:
                 # No year provided, use first result
-                match = re.search(r'/title/(tt\d+)/', response.text)
+                match = _RE_IMDB_ID.search(search_html)
                 if match:
-                    imdb_id = match.group(1)
+                    imdb_id = match.group(1).decode('ascii')
                 else:
                     return None
 
             # Get the title page which has poster image
             title_url = f"https://www.imdb.com/title/{imdb_id}/"
 
-            title_response = self.session.get(title_url, timeout=self.timeout)
-            title_response.raise_for_status()
+            # The poster JSON is near the top of the page; the year patterns may be further down
+            title_html = self._get_cached(title_url, stop_at=None if need_year else _RE_POSTER, cancel=cancel)
+            if cancel is not None and cancel.is_set():
+                return None
 
             # Look for poster image URL in the page
             # IMDb typically has images in format: https://m.media-amazon.com/images/...
-            poster_match = re.search(
-                r'"image"\s*:\s*\{"url"\s*:\s*"([^"]*amazon[^"]*\.jpg)',
-                title_response.text
-            )
+            poster_match = _RE_POSTER.search(title_html)
             if poster_match:
-                poster_url = poster_match.group(1)
+                poster_url = poster_match.group(1).decode('utf-8', 'replace')
                 # Fix escaped characters
                 poster_url = poster_url.replace('\\/', '/')
                 logger.info(f"Found poster for '{title}' (IMDb ID: {imdb_id})")
-                return poster_url
+                hit_year = self._extract_year_from_html(title_html, title) if need_year else None
+                return ImdbHit(poster_url, hit_year, imdb_id)
 
             # Fallback: look for any Amazon image
-            amazon_match = re.search(
-                r'https://m\.media-amazon\.com/images/[^"]*\.jpg',
-                title_response.text
-            )
+            amazon_match = _RE_AMAZON_IMAGE.search(title_html)
             if amazon_match:
                 logger.info(f"Found poster for '{title}' using fallback pattern (IMDb ID: {imdb_id})")
-                return amazon_match.group(0)
+                return ImdbHit(amazon_match.group(0).decode('utf-8', 'replace'), self._extract_year_from_html(title_html, title), imdb_id)
 
             return None
 
@@ -129,66 +345,83 @@ class PosterFetcher:
             logger.debug(f"IMDb search failed: {e}")
             return None
 
-    def _extract_year_from_imdb(self, title: str, year: Optional[int] = None) -> Optional[int]:
+    def _fetch_from_imdb_suggest(self, title: str, year: Optional[int] = None) -> Optional[ImdbHit]:
         """
-        Extract release year from IMDb title page
+        Fetch poster and year from the IMDb suggestion JSON API
 
         :param title: Movie/TV show title
-        :param year: Optional hint year (not used in extraction, only for searching)
-        :return: Release year or None
+        :param year: Optional release year; an exact match wins, then the nearest within 1 year
+        :return: ImdbHit or None if the API has no title result with an image (matching the year)
         """
         try:
-            # Build search query
-            query = title
-            if year:
-                query = f"{title} {year}"
-
-            # Use IMDb search URL
-            search_url = f"https://www.imdb.com/find?q={quote(query)}&s=tt"
-
-            response = self.session.get(search_url, timeout=self.timeout)
-            response.raise_for_status()
-
-            # Get first IMDb result
-            match = re.search(r'/title/(tt\d+)/', response.text)
-            if not match:
+            query = title.strip().lower()
+            first = query[0] if query[0].isalnum() else 'x'
+            data = orjson.loads(self._get_cached(IMDB_SUGGEST_URL.format(first=first, query=quote(query, safe=''))))
+
+            # Only title results (tt...) that come with a poster
+            results = [
+                item for item in data.get('d', [])
+                if str(item.get('id', '')).startswith('tt') and (item.get('i') or {}).get('imageUrl')
+            ]
+            if not results:
                 return None
 
-            imdb_id = match.group(1)
-
-            # Fetch the title page
-            title_url = f"https://www.imdb.com/title/{imdb_id}/"
-            title_response = self.session.get(title_url, timeout=self.timeout)
-            title_response.raise_for_status()
-
-            # Try multiple patterns to extract year
-            patterns = [
-                r'"releaseYear"\s*:\s*(\d{4})',
-                r'"datePublished"\s*:\s*"(\d{4})',
-                r'"birthDate"\s*:\s*"(\d{4})',
-                r'<span>(\d{4})</span>',
-            ]
+            match = results[0]
+            if year:
+                # Same rule as _find_matching_result_by_year; without a match the HTML lookup decides
+                dated = [item for item in results
+                         if isinstance(item.get('y'), int) and abs(item['y'] - year) <= 1]
+                if not dated:
+                    logger.debug(f"No IMDb suggestion within 1 year of {year} for '{title}'")
+                    return None
+                match = min(dated, key=lambda item: abs(item['y'] - year))
 
-            for pattern in patterns:
-                year_match = re.search(pattern, title_response.text)
-                if year_match:
-                    extracted_year = int(year_match.group(1))
-                    # Filter unrealistic years (prevent matching years like 1918 from currency data)
-                    if 1900 <= extracted_year <= 2100:
-                        logger.debug(f"Extracted year {extracted_year} from IMDb for '{title}'")
-                        return extracted_year
+            result_year = match.get('y')
+            if not (isinstance(result_year, int) and 1900 <= result_year <= 2100):
+                result_year = None
 
-            return None
+            logger.info(f"Found poster for '{title}' via IMDb suggestions (IMDb ID: {match['id']})")
+            return ImdbHit(match['i']['imageUrl'], result_year, match['id'])
 
         except Exception as e:
-            logger.debug(f"IMDb year extraction failed: {e}")
+            logger.debug(f"IMDb suggestion lookup failed: {e}")
             return None
 
-    def _find_matching_result_by_year(self, search_html: str, year: int) -> Optional[str]:
+    def _extract_year_from_html(self, title_html: bytes, title: str) -> Optional[int]:
+        """
+        Extract release year from an IMDb title page's HTML
+
+        :param title_html: IMDb title page HTML (raw bytes)
+        :param title: Movie/TV show title (for logging)
+        :return: Release year or None
+        """
+        # First match of each pattern, in one scan (a usable releaseYear ends it early)
+        found = {}
+        for match in _RE_YEAR_ANY.finditer(title_html):
+            kind = match.lastgroup
+            if kind in found:
+                continue
+            found[kind] = match
+            if len(found) == len(_YEAR_PATTERNS) or (
+                    kind == 'release_year' and 1900 <= int(match.group(match.lastindex + 1)) <= 2100):
+                break
+
+        for kind, _ in _YEAR_PATTERNS:
+            year_match = found.get(kind)
+            if year_match:
+                extracted_year = int(year_match.group(year_match.lastindex + 1))
+                # Filter unrealistic years (prevent matching years like 1918 from currency data)
+                if 1900 <= extracted_year <= 2100:
+                    logger.debug(f"Extracted year {extracted_year} from IMDb for '{title}'")
+                    return extracted_year
+
+        return None
+
+    def _find_matching_result_by_year(self, search_html: bytes, year: int) -> Optional[str]:
         r"""
         Find IMDb ID from search results that matches the given year
 
-        :param search_html: HTML content from IMDb search results
+        :param search_html: HTML content from IMDb search results (raw bytes)
         :param year: Release year to match
         :return: IMDb ID (tt\d+) if found, None otherwise
         """
@@ -198,17 +431,24 @@ class PosterFetcher:
             # This pattern finds title links followed by year in search results
 
             # Extract all title links with context around them
-            pattern = r'/title/(tt\d+)/[^>]*>([^<]+)</a>\s*\((\d{4})\)'
-            matches = re.finditer(pattern, search_html)
+            matches = _RE_SEARCH_RESULT_YEAR.finditer(search_html)
 
+            # Match if year is exact or within 1 year (accounting for release date variations)
+            # An exact year wins over an earlier off-by-one result, and ends the scan
+            close_match = None
             for match in matches:
-                imdb_id = match.group(1)
-                result_year = int(match.group(3))
+                imdb_id = match.group(1).decode('ascii')
+                distance = abs(int(match.group(3)) - year)
 
-                # Match if year is exact or within 1 year (accounting for release date variations)
-                if result_year == year or abs(result_year - year) <= 1:
+                if distance == 0:
                     logger.debug(f"Found matching IMDb ID {imdb_id} for year {year}")
                     return imdb_id
+                if distance == 1 and close_match is None:
+                    close_match = imdb_id
+
+            if close_match:
+                logger.debug(f"Found IMDb ID {close_match} within 1 year of {year}")
+                return close_match
 
             logger.debug(f"No exact year match found for year {year}")
             return None
@@ -226,15 +466,13 @@ class PosterFetcher:
         :return: Dictionary with poster info (url, title, year, source) or empty dict
         """
         try:
-            poster_url = self.fetch_poster(title, year)
-            if poster_url:
-                # Try to extract year from IMDb page if not provided
-                extracted_year = year
-                if not extracted_year:
-                    extracted_year = self._extract_year_from_imdb(title, year)
+            hit = self._fetch_hit(title, year, need_year=not year)
+            if hit:
+                # Use the year from the same IMDb title page if not provided
+                extracted_year = year or hit.year
 
                 return {
-                    'poster_url': poster_url,
+                    'poster_url': hit.poster_url,
                     'title': title,
                     'year': extracted_year,
                     'source': 'imdb'
@@ -252,9 +490,7 @@ def extract_year_from_title(title: str) -> tuple:
     :param title: Title string
     :return: Tuple of (cleaned_title, year) or (title, None)
     """
-    import re
-
-    match = re.search(r'\((\d{4})\)$', title.strip())
+    match = _RE_TITLE_YEAR.search(title.strip())
     if match:
         year = int(match.group(1))
         clean_title = title[:match.start()].strip()
@@ -4,19 +4,101 @@ Handles all HTTP endpoints
 """
 
 from flask import render_template, request, Blueprint
-import re
 import os
 import logging
-from app.models import NetflixScraper
+import threading
+from pathlib import Path
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as LookupTimeout
+import requests
 
 bp = Blueprint('main', __name__)
 
 logger = logging.getLogger(__name__)
 
+# One HTTP session and scraper per worker thread, so connections are reused across requests
+_thread_local = threading.local()
+
+# Lookups run on a bounded pool, so a slow Netflix/IMDb fetch cannot hold a request forever
+LOOKUP_TIMEOUT = int(os.environ.get('LOOKUP_TIMEOUT', 30))
+_lookup_executor = ThreadPoolExecutor(max_workers=int(os.environ.get('LOOKUP_WORKERS', 32)),
+                                      thread_name_prefix='lookup')
+
 # Define constants
 INDEX_TEMPLATE = 'index.html'
 RESULT_TEMPLATE = 'result.html'
 
+# URL markers that precede a title ID, in priority order
+_TITLE_ID_MARKERS = ('/title/', 'jbv=', '/watch/', '/latest/')
+
+
+# cookies.txt locations: cookies/ folder first, then the root (backward compatibility)
+_CWD = Path.cwd()
+COOKIES_CANDIDATES = (_CWD / 'cookies' / 'cookies.txt', _CWD / 'cookies.txt')
+
+# Resolved once at import, which every entry point (app.py, wsgi.py, asgi.py) goes through
+COOKIES_PATH = next((p for p in COOKIES_CANDIDATES if p.exists()), None)
+
+# cookies.txt location handed to the scraper
+_cookies_path = str(COOKIES_PATH) if COOKIES_PATH else None
+
+
+def get_cookies_path():
+    """Return the cookies.txt path, or None if there is none
+
+    Once found, the location is fixed for the life of the process: edits or
+    re-exports of that file are picked up by the scraper's mtime check, but
+    moving it (or adding cookies/cookies.txt next to a root cookies.txt)
+    takes a restart. Until a file is found, the candidates are probed on
+    each call so one can be added without restarting.
+    """
+    global _cookies_path
+    if _cookies_path is None:
+        _cookies_path = next((str(p) for p in COOKIES_CANDIDATES if p.exists()), None)
+    return _cookies_path
+
+
+def get_http_session():
+    """Return the calling thread's shared requests.Session"""
+    session = getattr(_thread_local, 'session', None)
+    if session is None:
+        from app.models import NetflixScraper
+        session = _thread_local.session = NetflixScraper.mount_pooled_adapter(requests.Session())
+    return session
+
+
+def _number_after(text: str, marker: str):
+    """Return the digits right after the first occurrence of marker that is followed by digits"""
+    i = text.find(marker)
+    while i != -1:
+        # jbv is a query parameter, so it must follow ? or &
+        if marker != 'jbv=' or (i > 0 and text[i - 1] in '?&'):
+            start = end = i + len(marker)
+            while end < len(text) and text[end].isdecimal():
+                end += 1
+            if end > start:
+                return text[start:end]
+        i = text.find(marker, i + 1)
+    return None
+
+
+def get_scraper(cookies_path):
+    """Return the calling thread's NetflixScraper, rebuilt when cookies.txt changes
+
+    The scraper keeps per-lookup state, so it is shared between requests on the same
+    thread rather than between threads.
+    """
+    # Imported here, so the scraper and its dependencies load on the first lookup, not at app start
+    from app.models import NetflixScraper
+    scraper = getattr(_thread_local, 'scraper', None)
+    if scraper is None or scraper.cookies_path != cookies_path or scraper.cookies_changed():
+        scraper = _thread_local.scraper = NetflixScraper(cookies_path, session=get_http_session())
+    return scraper
+
+
+def run_lookup(cookies_path, title_id):
+    """Check formats for a title on the lookup pool's thread (and its HTTP session)"""
+    return get_scraper(cookies_path).check_formats(title_id)
+
 
 def extract_title_id(url_or_id: str):
     """Extract numeric Netflix title id from various URL formats"""
@@ -25,28 +107,14 @@ def extract_title_id(url_or_id: str):
 
     url_or_id = url_or_id.strip()
 
-    # Pattern 1: /title/NUMBER
-    m = re.search(r"/title/(\d+)", url_or_id)
-    if m:
-        return m.group(1)
-
-    # Pattern 2: jbv=NUMBER (browse URLs)
-    m = re.search(r"[?&]jbv=(\d+)", url_or_id)
-    if m:
-        return m.group(1)
-
-    # Pattern 3: /watch/NUMBER
-    m = re.search(r"/watch/(\d+)", url_or_id)
-    if m:
-        return m.group(1)
-
-    # Pattern 4: /latest/NUMBER
-    m = re.search(r"/latest/(\d+)", url_or_id)
-    if m:
-        return m.group(1)
+    # Patterns 1-4: /title/NUMBER, jbv=NUMBER (browse URLs), /watch/NUMBER, /latest/NUMBER
+    for marker in _TITLE_ID_MARKERS:
+        title_id = _number_after(url_or_id, marker)
+        if title_id:
+            return title_id
 
     # Pattern 5: bare NUMBER
-    if re.fullmatch(r"\d+", url_or_id):
+    if url_or_id.isdecimal():
         return url_or_id
 
     return None
@@ -80,13 +148,8 @@ def lookup():
 
     try:
         # Check for cookies file
-        # Try cookies/ folder first, then fall back to root
-        cookies_path = os.path.join(os.getcwd(), "cookies", "cookies.txt")
-        if not os.path.exists(cookies_path):
-            # Fallback to root directory for backward compatibility
-            cookies_path = os.path.join(os.getcwd(), "cookies.txt")
-
-        if not os.path.exists(cookies_path):
+        cookies_path = get_cookies_path()
+        if not cookies_path:
             return render_template(INDEX_TEMPLATE, error=(
                 "⚠️ cookies.txt not found!\n\n"
                 "Please follow these steps:\n\n"
@@ -100,8 +163,14 @@ def lookup():
 
         # Check formats using HTML scraping
         logger.info(f"Checking formats for title {title_id}...")
-        scraper = NetflixScraper(cookies_path)
-        analysis = scraper.check_formats(title_id)
+        future = _lookup_executor.submit(run_lookup, cookies_path, title_id)
+        try:
+            analysis = future.result(timeout=LOOKUP_TIMEOUT)
+        except LookupTimeout:
+            logger.error(f"Lookup for title {title_id} timed out after {LOOKUP_TIMEOUT}s")
+            return render_template(INDEX_TEMPLATE, error=(
+                f'The lookup took longer than {LOOKUP_TIMEOUT} seconds. Netflix or IMDb may be slow, please try again.'
+            ))
 
         logger.info(f"Analysis complete: DV={analysis.get('dolby_vision')}, HDR={analysis.get('hdr10')}, Atmos={analysis.get('atmos')}")
 
@@ -180,12 +249,10 @@ def lookup():
 @bp.route('/health', methods=['GET'])
 def health():
     """Health check endpoint"""
-    cookies_path = os.path.join(os.getcwd(), "cookies", "cookies.txt")
-    if not os.path.exists(cookies_path):
-        cookies_path = os.path.join(os.getcwd(), "cookies.txt")
-
+    # The path is cached once found, so check the file itself is still there
+    cookies_path = get_cookies_path()
     status = {
         'status': 'ok',
-        'cookies_exist': os.path.exists(cookies_path)
+        'cookies_exist': cookies_path is not None and os.path.exists(cookies_path)
     }
     return status
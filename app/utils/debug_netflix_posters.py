@@ -6,10 +6,21 @@ Run this with a Netflix title ID to see what poster data is available
 
 import requests
 import re
-import json
+import orjson
 from http.cookiejar import MozillaCookieJar
 import sys
 
+# og:image and twitter:image meta tags, found in one pass
+_META_IMAGE_RE = re.compile(r'<meta (?:property="(og):image"|name="(twitter):image") content="([^"]+)"')
+_BOXART_RE = re.compile(r'"boxArt"\s*:\s*\{([^}]+)\}')
+_NETFLIX_IMAGE_RE = re.compile(r'(https?://[^"]*(?:nflx|occ-)[^"]*\.(?:jpg|jpeg|png))', re.IGNORECASE)
+
+# Shared session, so repeated runs in one process reuse the connection
+session = requests.Session()
+session.headers.update({
+    'User-Agent': 'Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36'
+})
+
 def analyze_netflix_posters(title_id, cookies_path=None):
     """Analyze poster data from Netflix page"""
 
@@ -24,28 +35,31 @@ def analyze_netflix_posters(title_id, cookies_path=None):
         # Load cookies
         jar = MozillaCookieJar(cookies_path)
         jar.load(ignore_discard=True, ignore_expires=True)
-        cookies = {c.name: c.value for c in jar}
+        session.cookies = jar
 
         # Fetch page
         url = f"https://www.netflix.com/title/{title_id}"
-        headers = {
-            'User-Agent': 'Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36'
-        }
 
         print(f"Fetching: {url}\n")
-        response = requests.get(url, headers=headers, cookies=cookies, timeout=15)
+        response = session.get(url, timeout=15)
         html = response.text
 
         print("=" * 80)
         print("ANALYZING NETFLIX POSTER SOURCES")
         print("=" * 80)
 
+        # Scan once for both meta image tags (first of each)
+        meta_images = {}
+        for match in _META_IMAGE_RE.finditer(html):
+            meta_images.setdefault(match.group(1) or match.group(2), match.group(3))
+            if len(meta_images) == 2:
+                break
+
         # 1. Check og:image meta tag
         print("\n1. OG:IMAGE META TAG")
         print("-" * 80)
-        match = re.search(r'<meta property="og:image" content="([^"]+)"', html)
-        if match:
-            og_image = match.group(1)
+        og_image = meta_images.get('og')
+        if og_image:
             print(f"Found: {og_image[:100]}")
             print(f"Domain: {'netflix' if 'nflx' in og_image.lower() or 'occ-' in og_image else 'OTHER'}")
         else:
@@ -54,9 +68,8 @@ def analyze_netflix_posters(title_id, cookies_path=None):
         # 2. Check twitter:image
         print("\n2. TWITTER:IMAGE META TAG")
         print("-" * 80)
-        match = re.search(r'<meta name="twitter:image" content="([^"]+)"', html)
-        if match:
-            tw_image = match.group(1)
+        tw_image = meta_images.get('twitter')
+        if tw_image:
             print(f"Found: {tw_image[:100]}")
             print(f"Domain: {'netflix' if 'nflx' in tw_image.lower() or 'occ-' in tw_image else 'OTHER'}")
         else:
@@ -67,8 +80,7 @@ def analyze_netflix_posters(title_id, cookies_path=None):
         print("-" * 80)
 
         # Find all boxArt patterns
-        boxart_pattern = r'"boxArt"\s*:\s*\{([^}]+)\}'
-        matches = re.finditer(boxart_pattern, html)
+        matches = _BOXART_RE.finditer(html)
         boxart_count = 0
 
         for i, match in enumerate(matches, 1):
@@ -79,7 +91,7 @@ def analyze_netflix_posters(title_id, cookies_path=None):
 
             # Try to parse it
             try:
-                parsed = json.loads(boxart_data)
+                parsed = orjson.loads(boxart_data)
                 for key in parsed:
                     if isinstance(parsed[key], str) and 'http' in parsed[key]:
                         print(f"  {key}: {parsed[key][:80]}")
@@ -119,8 +131,7 @@ def analyze_netflix_posters(title_id, cookies_path=None):
         print("-" * 80)
 
         # Look for image URLs that are from Netflix
-        netflix_image_pattern = r'(https?://[^"]*(?:nflx|occ-)[^"]*\.(?:jpg|jpeg|png))'
-        matches = re.finditer(netflix_image_pattern, html, re.IGNORECASE)
+        matches = _NETFLIX_IMAGE_RE.finditer(html)
         image_count = 0
         urls_found = set()
 
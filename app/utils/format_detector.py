@@ -7,14 +7,76 @@ import base64
 import logging
 import re
 import xml.etree.ElementTree as ET
-from typing import Dict, List, Optional
+from functools import lru_cache
+from typing import Dict, List, Tuple
+
+logger = logging.getLogger("FormatDetector")
+
+# Manifests repeat a handful of codec strings across many tracks, so results are cached per string
+CODEC_CACHE_SIZE = 256
+
+# Codec string tokens. Each pattern is a lookahead tried at every position, so one
+# finditer reports every token present (overlapping ones too), case-insensitively.
+_VIDEO_CODEC_RE = re.compile(
+    r'(?=(?P<h264>h264|avc)|(?P<hevc>h265|hev|hvc)|(?P<vp9>vp9)|(?P<av1>av1|av01)|(?P<dvhe>dvhe|dvh1))',
+    re.IGNORECASE | re.ASCII)
+_VIDEO_FORMAT_RE = re.compile(
+    r'(?=(?P<dv5>dv(?:he\.0|h1\.0)?5)|(?P<dv7>dv(?:he\.0|h1\.0)?7)|(?P<dv8>dv(?:he\.0|h1\.0)?8)'
+    r'|(?P<dv4>dv(?:he\.0|h1\.0)?4)|(?P<dv>dv|dolbyvision)|(?P<hdr10plus>hdr10(?:\+|plus))|(?P<hdr>hdr)'
+    r'|(?P<hlg>hlg))',
+    re.IGNORECASE | re.ASCII)
+_AUDIO_CODEC_RE = re.compile(
+    r'(?=(?P<aac>aac)|(?P<ac3>ac3)|(?P<ac_3>ac-3)|(?P<ddplus>ddplus)|(?P<dd>dd)|(?P<ec3>ec3)|(?P<ec_3>ec-3)'
+    r'|(?P<eac3>eac3)|(?P<opus>opus)|(?P<vorbis>vorbis)|(?P<atmos>atmos))',
+    re.IGNORECASE | re.ASCII)
+
+# Audio codec names by the tokens that identify them, in priority order. E-AC-3 is checked
+# before AC-3: 'eac3' contains 'ac3', and 'ddplus' is reported as its own token, not 'dd'.
+_AUDIO_CODEC_NAMES = (
+    ('AAC', {'aac'}),
+    ('Dolby Digital Plus (E-AC-3)', {'ec_3', 'ec3', 'ddplus', 'eac3'}),
+    ('Dolby Digital (AC-3)', {'ac_3', 'ac3', 'dd'}),
+    ('Opus', {'opus'}),
+    ('Vorbis', {'vorbis'}),
+)
+
+# Audio format labels for the common channel counts (other surround counts use the channels/2 formula)
+_CHANNEL_LABELS = {1: 'Mono', 2: 'Stereo', 6: '5.1 Surround', 8: '7.1 Surround', 10: '9.1 Surround'}
+
+_DV_PROFILES = (('dv5', '5'), ('dv7', '7'), ('dv8', '8'), ('dv4', '4'))
+
+# Resolution labels by minimum height, highest first
+_RESOLUTION_LABELS = (
+    (2160, "UHD (4K)"),
+    (1440, "QHD (1440p)"),
+    (1080, "FHD (1080p)"),
+    (720, "HD (720p)"),
+    (480, "SD (480p)"),
+)
+
+
+_MISSING = object()
+
+
+def _first(track: dict, *keys, default=None):
+    """Value of the first of keys present in track (the fallback keys are only looked up when needed)"""
+    for key in keys:
+        value = track.get(key, _MISSING)
+        if value is not _MISSING:
+            return value
+    return default
+
+
+def _find_tokens(pattern: re.Pattern, codec_string: str) -> set:
+    """Names of the tokens of pattern found anywhere in codec_string"""
+    return {match.lastgroup for match in pattern.finditer(codec_string)}
 
 
 class FormatDetector:
     """Detects available video and audio formats from Netflix manifest data"""
 
-    def __init__(self):
-        self.log = logging.getLogger("FormatDetector")
+    # Shared module logger; the detector holds no per-instance state
+    log = logger
 
     def analyze_manifest(self, manifest_data: dict) -> Dict:
         """
@@ -50,46 +112,22 @@ class FormatDetector:
         else:
             mpd_data = manifest_data
 
-        # Look for video tracks in the manifest
-        if 'video_tracks' in mpd_data:
-            result['video_tracks'] = self._parse_video_tracks(mpd_data['video_tracks'])
+        # Look for video tracks in the manifest (capabilities are summarized while parsing)
+        result['video_tracks'], video_summary = self._parse_video_tracks(mpd_data.get('video_tracks', []))
 
         # Look for audio tracks
-        if 'audio_tracks' in mpd_data:
-            result['audio_tracks'] = self._parse_audio_tracks(mpd_data['audio_tracks'])
+        result['audio_tracks'], result['atmos'] = self._parse_audio_tracks(mpd_data.get('audio_tracks', []))
 
         # Look for subtitle tracks
         if 'timedtexttracks' in mpd_data:
             result['subtitle_tracks'] = self._parse_subtitle_tracks(mpd_data['timedtexttracks'])
 
-        # Parse from MPD if available
-        if 'url' in mpd_data or 'urls' in mpd_data:
-            mpd_tracks = self._parse_mpd_manifest(mpd_data)
-            if mpd_tracks['video_tracks']:
-                result['video_tracks'].extend(mpd_tracks['video_tracks'])
-            if mpd_tracks['audio_tracks']:
-                result['audio_tracks'].extend(mpd_tracks['audio_tracks'])
-
         # Determine overall capabilities
-        for track in result['video_tracks']:
-            if 'dolby_vision' in track.get('format', '').lower() or track.get('dv', False):
-                result['dolby_vision'] = True
-            if 'hdr10' in track.get('format', '').lower() or track.get('hdr10', False):
-                result['hdr10'] = True
-
-            # Track max resolution
-            if track.get('width') and track.get('height'):
-                resolution = f"{track['width']}x{track['height']}"
-                if not result['max_resolution'] or self._compare_resolutions(resolution, result['max_resolution']) > 0:
-                    result['max_resolution'] = resolution
-
-            # Track max bitrate
-            if track.get('bitrate', 0) > result['max_bitrate']:
-                result['max_bitrate'] = track['bitrate']
-
-        for track in result['audio_tracks']:
-            if 'atmos' in track.get('format', '').lower() or track.get('atmos', False):
-                result['atmos'] = True
+        result['dolby_vision'] = video_summary['dolby_vision']
+        result['hdr10'] = video_summary['hdr10']
+        if video_summary['max_size']:
+            result['max_resolution'] = "%sx%s" % video_summary['max_size']
+        result['max_bitrate'] = video_summary['max_bitrate']
 
         # Convert max resolution to human-readable label
         if result['max_resolution']:
@@ -97,26 +135,33 @@ class FormatDetector:
 
         return result
 
-    def _parse_video_tracks(self, video_tracks: List[dict]) -> List[dict]:
-        """Parse video tracks from manifest"""
+    def _parse_video_tracks(self, video_tracks: List[dict]) -> Tuple[List[dict], dict]:
+        """
+        Parse video tracks from manifest
+
+        :return: (tracks, summary) where summary holds the dolby_vision/hdr10 flags,
+                 max_size (the largest (width, height) by max_pixels) and max_bitrate over the tracks
+        """
         tracks = []
+        summary = {'dolby_vision': False, 'hdr10': False, 'max_pixels': 0,
+                   'max_size': None, 'max_bitrate': 0}
 
         for track in video_tracks:
             track_info = {
-                'id': track.get('trackId', track.get('id')),
+                'id': _first(track, 'trackId', 'id'),
                 'bitrate': track.get('bitrate', 0),
-                'width': track.get('width', track.get('res_w')),
-                'height': track.get('height', track.get('res_h')),
+                'width': _first(track, 'width', 'res_w'),
+                'height': _first(track, 'height', 'res_h'),
                 'codec': None,
                 'format': 'SDR',
-                'fps': track.get('framerate', track.get('fps')),
+                'fps': _first(track, 'framerate', 'fps'),
                 'hdr10': False,
                 'dv': False,
                 'profile': None
             }
 
             # Detect codec and format from various fields
-            codec = track.get('codec', track.get('content_profile', ''))
+            codec = _first(track, 'codec', 'content_profile', default='')
 
             # Parse codec information
             if codec:
@@ -125,33 +170,66 @@ class FormatDetector:
                     self._detect_video_format(codec)
 
             tracks.append(track_info)
+            self._summarize_video_track(track_info, summary)
 
-        return tracks
+        return tracks, summary
+
+    @staticmethod
+    def _summarize_video_track(track: dict, summary: dict):
+        """Fold one parsed video track into a _parse_video_tracks summary"""
+        # Flags already set by an earlier track need no further checks
+        if not summary['dolby_vision'] and (
+                'dolby_vision' in track.get('format', '').lower() or track.get('dv', False)):
+            summary['dolby_vision'] = True
+        if not summary['hdr10'] and ('hdr10' in track.get('format', '').lower() or track.get('hdr10', False)):
+            summary['hdr10'] = True
+
+        # Track max resolution (compared by pixel count)
+        if track.get('width') and track.get('height'):
+            pixels = int(track['width']) * int(track['height'])
+            if not summary['max_size'] or pixels > summary['max_pixels']:
+                summary['max_pixels'] = pixels
+                summary['max_size'] = (track['width'], track['height'])
+
+        # Track max bitrate
+        if track.get('bitrate', 0) > summary['max_bitrate']:
+            summary['max_bitrate'] = track['bitrate']
+
+    @staticmethod
+    def _is_atmos_track(track: dict) -> bool:
+        """Whether a parsed audio track is Dolby Atmos"""
+        return 'atmos' in track.get('format', '').lower() or track.get('atmos', False)
 
-    def _parse_audio_tracks(self, audio_tracks: List[dict]) -> List[dict]:
-        """Parse audio tracks from manifest"""
+    def _parse_audio_tracks(self, audio_tracks: List[dict]) -> Tuple[List[dict], bool]:
+        """
+        Parse audio tracks from manifest
+
+        :return: (tracks, whether any track is Dolby Atmos)
+        """
         tracks = []
+        atmos = False
 
         for track in audio_tracks:
             track_info = {
-                'id': track.get('trackId', track.get('id')),
-                'language': track.get('language', track.get('languageDescription', 'Unknown')),
+                'id': _first(track, 'trackId', 'id'),
+                'language': _first(track, 'language', 'languageDescription', default='Unknown'),
                 'bitrate': track.get('bitrate', 0),
-                'channels': track.get('channels', track.get('channelsCount')),
+                'channels': _first(track, 'channels', 'channelsCount'),
                 'codec': None,
                 'format': 'Stereo',
                 'atmos': False
             }
 
             # Detect codec and format
-            codec = track.get('codec', track.get('content_profile', ''))
+            codec = _first(track, 'codec', 'content_profile', default='')
             if codec:
                 track_info['codec'] = self._parse_audio_codec(codec)
                 track_info['format'], track_info['atmos'] = self._detect_audio_format(codec, track)
 
             tracks.append(track_info)
+            atmos = atmos or self._is_atmos_track(track_info)
 
-        return tracks
+        return tracks, atmos
 
     def _parse_subtitle_tracks(self, subtitle_tracks: List[dict]) -> List[dict]:
         """Parse subtitle tracks from manifest"""
@@ -159,8 +237,8 @@ class FormatDetector:
 
         for track in subtitle_tracks:
             track_info = {
-                'id': track.get('trackId', track.get('id')),
-                'language': track.get('language', track.get('languageDescription', 'Unknown')),
+                'id': _first(track, 'trackId', 'id'),
+                'language': _first(track, 'language', 'languageDescription', default='Unknown'),
                 'type': track.get('trackType', 'subtitle'),
                 'forced': track.get('isForcedNarrative', False),
                 'sdh': 'sdh' in track.get('trackType', '').lower()
@@ -169,55 +247,38 @@ class FormatDetector:
 
         return tracks
 
-    def _parse_mpd_manifest(self, mpd_data: dict) -> Dict:
-        """Parse DASH MPD XML manifest if available"""
-        result = {
-            'video_tracks': [],
-            'audio_tracks': []
-        }
-
-        # This would require fetching and parsing the actual MPD XML
-        # For now, we'll work with the structured data Netflix provides
-
-        return result
-
-    def _parse_video_codec(self, codec_string: str) -> str:
+    @staticmethod
+    @lru_cache(maxsize=CODEC_CACHE_SIZE)
+    def _parse_video_codec(codec_string: str) -> str:
         """Parse video codec from codec string"""
-        codec_lower = codec_string.lower()
+        tokens = _find_tokens(_VIDEO_CODEC_RE, codec_string)
 
-        if 'h264' in codec_lower or 'avc' in codec_lower:
+        if 'h264' in tokens:
             return 'H.264'
-        elif 'h265' in codec_lower or 'hevc' in codec_lower or 'hev' in codec_lower or 'hvc' in codec_lower:
+        elif 'hevc' in tokens:
             return 'H.265/HEVC'
-        elif 'vp9' in codec_lower:
+        elif 'vp9' in tokens:
             return 'VP9'
-        elif 'av1' in codec_lower or 'av01' in codec_lower:
+        elif 'av1' in tokens:
             return 'AV1'
-        elif 'dvhe' in codec_lower or 'dvh1' in codec_lower:
+        elif 'dvhe' in tokens:
             return 'H.265/HEVC (Dolby Vision)'
 
         return codec_string
 
-    def _detect_video_format(self, codec_string: str) -> tuple:
+    @staticmethod
+    @lru_cache(maxsize=CODEC_CACHE_SIZE)
+    def _detect_video_format(codec_string: str) -> tuple:
         """
         Detect video format from codec string
 
         :return: (format_name, is_hdr10, is_dolby_vision, dv_profile)
         """
-        codec_lower = codec_string.lower()
-
-        # Dolby Vision detection
-        if 'dv' in codec_lower or 'dolbyvision' in codec_lower:
-            # Extract Dolby Vision profile
-            profile = None
-            if 'dv5' in codec_lower or 'dvhe.05' in codec_lower or 'dvh1.05' in codec_lower:
-                profile = '5'
-            elif 'dv7' in codec_lower or 'dvhe.07' in codec_lower or 'dvh1.07' in codec_lower:
-                profile = '7'
-            elif 'dv8' in codec_lower or 'dvhe.08' in codec_lower or 'dvh1.08' in codec_lower:
-                profile = '8'
-            elif 'dv4' in codec_lower or 'dvhe.04' in codec_lower or 'dvh1.04' in codec_lower:
-                profile = '4'
+        tokens = _find_tokens(_VIDEO_FORMAT_RE, codec_string)
+
+        # Dolby Vision detection (any profile token is also a 'dv' match)
+        profile = next((profile for token, profile in _DV_PROFILES if token in tokens), None)
+        if profile or 'dv' in tokens:
 
             format_name = f"Dolby Vision"
             if profile:
@@ -226,33 +287,27 @@ class FormatDetector:
             return (format_name, False, True, profile)
 
         # HDR10 detection
-        if 'hdr' in codec_lower:
-            if 'hdr10+' in codec_lower or 'hdr10plus' in codec_lower:
-                return ('HDR10+', True, False, None)
-            else:
-                return ('HDR10', True, False, None)
+        if 'hdr10plus' in tokens:
+            return ('HDR10+', True, False, None)
+        elif 'hdr' in tokens:
+            return ('HDR10', True, False, None)
 
         # HLG detection
-        if 'hlg' in codec_lower:
+        if 'hlg' in tokens:
             return ('HLG', False, False, None)
 
         # Default to SDR
         return ('SDR', False, False, None)
 
-    def _parse_audio_codec(self, codec_string: str) -> str:
+    @staticmethod
+    @lru_cache(maxsize=CODEC_CACHE_SIZE)
+    def _parse_audio_codec(codec_string: str) -> str:
         """Parse audio codec from codec string"""
-        codec_lower = codec_string.lower()
-
-        if 'aac' in codec_lower:
-            return 'AAC'
-        elif 'ac-3' in codec_lower or 'ac3' in codec_lower or 'dd' in codec_lower and 'ddplus' not in codec_lower:
-            return 'Dolby Digital (AC-3)'
-        elif 'ec-3' in codec_lower or 'ec3' in codec_lower or 'ddplus' in codec_lower or 'eac3' in codec_lower:
-            return 'Dolby Digital Plus (E-AC-3)'
-        elif 'opus' in codec_lower:
-            return 'Opus'
-        elif 'vorbis' in codec_lower:
-            return 'Vorbis'
+        tokens = _find_tokens(_AUDIO_CODEC_RE, codec_string)
+
+        for name, codec_tokens in _AUDIO_CODEC_NAMES:
+            if not tokens.isdisjoint(codec_tokens):
+                return name
 
         return codec_string
 
@@ -262,30 +317,43 @@ class FormatDetector:
 
         :return: (format_name, is_atmos)
         """
-        codec_lower = codec_string.lower()
+        is_atmos, codec_format = self._detect_audio_format_by_codec(codec_string)
 
         # Atmos detection
-        if 'atmos' in codec_lower:
+        if is_atmos:
             channels = track_data.get('channels', 0)
             return (f'Dolby Atmos ({channels} channels)', True)
 
         # Standard surround sound
         channels = track_data.get('channels', 0)
         if channels:
+            label = _CHANNEL_LABELS.get(channels)
+            if label:
+                return (label, False)
             if channels >= 6:
                 return (f'{channels/2:.1f} Surround', False)
-            elif channels == 2:
-                return ('Stereo', False)
-            elif channels == 1:
-                return ('Mono', False)
+
+        # Fall back to the format named in the codec
+        return (codec_format, False)
+
+    @staticmethod
+    @lru_cache(maxsize=CODEC_CACHE_SIZE)
+    def _detect_audio_format_by_codec(codec_string: str) -> tuple:
+        """
+        Detect the channel-independent part of the audio format from a codec string
+
+        :return: (is_atmos, format_name used when the track has no usable channel count)
+        """
+        tokens = _find_tokens(_AUDIO_CODEC_RE, codec_string)
+        is_atmos = 'atmos' in tokens
 
         # Check for specific formats in codec
-        if 'ddplus' in codec_lower or 'ec-3' in codec_lower:
-            return ('Dolby Digital Plus 5.1', False)
-        elif 'dd' in codec_lower or 'ac-3' in codec_lower:
-            return ('Dolby Digital 5.1', False)
+        if 'ddplus' in tokens or 'ec_3' in tokens:
+            return (is_atmos, 'Dolby Digital Plus 5.1')
+        elif 'dd' in tokens or 'ac_3' in tokens:
+            return (is_atmos, 'Dolby Digital 5.1')
 
-        return ('Stereo', False)
+        return (is_atmos, 'Stereo')
 
     @staticmethod
     def _classify_resolution(resolution: str) -> str:
@@ -296,45 +364,16 @@ class FormatDetector:
         :return: Label like "UHD (4K)", "FHD (1080p)", etc.
         """
         try:
-            w, h = map(int, resolution.split('x'))
-            pixels = w * h
+            h = int(resolution.partition('x')[2])
 
             # Classifications based on height (more reliable than pixel count)
-            if h >= 2160:  # 4K / UHD
-                return "UHD (4K)"
-            elif h >= 1440:  # QHD
-                return "QHD (1440p)"
-            elif h >= 1080:  # Full HD
-                return "FHD (1080p)"
-            elif h >= 720:  # HD
-                return "HD (720p)"
-            elif h >= 480:  # SD
-                return "SD (480p)"
-            else:
-                return f"{resolution}"
+            for min_height, label in _RESOLUTION_LABELS:
+                if h >= min_height:
+                    return label
+            return f"{resolution}"
         except:
             return resolution
 
-    @staticmethod
-    def _compare_resolutions(res1: str, res2: str) -> int:
-        """
-        Compare two resolution strings
-
-        :return: 1 if res1 > res2, -1 if res1 < res2, 0 if equal
-        """
-        def parse_res(res):
-            w, h = map(int, res.split('x'))
-            return w * h
-
-        pixels1 = parse_res(res1)
-        pixels2 = parse_res(res2)
-
-        if pixels1 > pixels2:
-            return 1
-        elif pixels1 < pixels2:
-            return -1
-        return 0
-
     def format_results(self, analysis: dict) -> str:
         """Format analysis results as a readable string"""
         lines = []
@@ -4,8 +4,9 @@ Simplified implementation for Netflix format checking
 Based on Vinetrimmer MSL implementation
 """
 
-import base64
 import gzip
+import hashlib
+import hmac
 import json
 import logging
 import os
@@ -14,11 +15,10 @@ import ssl
 import time
 import zlib
 from datetime import datetime
-from io import BytesIO
 
+import orjson
 import requests
 from Cryptodome.Cipher import AES, PKCS1_OAEP
-from Cryptodome.Hash import HMAC, SHA256
 from Cryptodome.PublicKey import RSA
 from Cryptodome.Random import get_random_bytes
 from Cryptodome.Util import Padding
@@ -26,14 +26,21 @@ from requests.adapters import HTTPAdapter
 from requests.packages.urllib3.poolmanager import PoolManager
 from requests.packages.urllib3.util import ssl_
 
+try:
+    import pybase64 as base64
+except ImportError:  # Optional: SIMD base64; the stdlib module has the same API
+    import base64
+
 
 class MSLKeys:
     """Stores MSL encryption/signing keys and master token"""
-    def __init__(self, encryption=None, sign=None, rsa=None, mastertoken=None):
+    def __init__(self, encryption=None, sign=None, rsa=None, mastertoken=None, sequence_number=None):
         self.encryption = encryption
         self.sign = sign
         self.rsa = rsa
         self.mastertoken = mastertoken
+        # Master token sequence number, decoded once from its tokendata (used in every keyid)
+        self.sequence_number = sequence_number
 
 
 class NetflixMSL:
@@ -45,6 +52,62 @@ class NetflixMSL:
         "ECDHE-RSA-AES128-GCM-SHA256:ECDHE-RSA-AES128-SHA256:AES256-SHA"
     )
 
+    # Message capabilities, the same in every header (shared, never modified)
+    CAPABILITIES = {
+        "compressionalgos": ["GZIP"],
+        "languages": ["en-US"],
+        "encoderformats": ["JSON"]
+    }
+
+    # Comprehensive set of profiles requested by default, to detect all formats
+    DEFAULT_PROFILES = (
+        # Video - H.264
+        "playready-h264mpl30-dash",
+        "playready-h264mpl31-dash",
+        "playready-h264hpl30-dash",
+        "playready-h264hpl31-dash",
+        # Video - HEVC SDR
+        "hevc-main-L30-dash-cenc",
+        "hevc-main-L31-dash-cenc",
+        "hevc-main10-L30-dash-cenc",
+        "hevc-main10-L31-dash-cenc",
+        "hevc-main10-L40-dash-cenc",
+        "hevc-main10-L41-dash-cenc",
+        "hevc-main10-L50-dash-cenc",
+        "hevc-main10-L51-dash-cenc",
+        # Video - HEVC HDR10
+        "hevc-hdr-main10-L30-dash-cenc",
+        "hevc-hdr-main10-L31-dash-cenc",
+        "hevc-hdr-main10-L40-dash-cenc",
+        "hevc-hdr-main10-L41-dash-cenc",
+        "hevc-hdr-main10-L50-dash-cenc",
+        "hevc-hdr-main10-L51-dash-cenc",
+        # Video - Dolby Vision
+        "hevc-dv-main10-L30-dash-cenc",
+        "hevc-dv-main10-L31-dash-cenc",
+        "hevc-dv-main10-L40-dash-cenc",
+        "hevc-dv-main10-L41-dash-cenc",
+        "hevc-dv-main10-L50-dash-cenc",
+        "hevc-dv-main10-L51-dash-cenc",
+        "hevc-dv5-main10-L30-dash-cenc",
+        "hevc-dv5-main10-L31-dash-cenc",
+        "hevc-dv5-main10-L40-dash-cenc",
+        "hevc-dv5-main10-L41-dash-cenc",
+        "hevc-dv5-main10-L50-dash-cenc",
+        "hevc-dv5-main10-L51-dash-cenc",
+        # Audio
+        "heaac-2-dash",
+        "heaac-2hq-dash",
+        "ddplus-2.0-dash",
+        "ddplus-5.1-dash",
+        "ddplus-5.1hq-dash",
+        "dd-5.1-dash",
+        "ddplus-atmos-dash",
+        # Subtitles
+        "webvtt-lssdh-ios8",
+        "dfxp-ls-sdh"
+    )
+
     def __init__(self, esn, cookies_dict, endpoint="https://www.netflix.com/api/shakti/msl", cache_path=None):
         """
         Initialize Netflix MSL client
@@ -117,11 +180,7 @@ class NetflixMSL:
             "messageid": self.message_id,
             "renewable": True,
             "handshake": True,
-            "capabilities": {
-                "compressionalgos": ["GZIP"],
-                "languages": ["en-US"],
-                "encoderformats": ["JSON"]
-            },
+            "capabilities": self.CAPABILITIES,
             "timestamp": int(time.time()),
             "sender": self.esn,
             "nonreplayable": False,
@@ -191,6 +250,7 @@ class NetflixMSL:
 
         # Store master token
         self.keys.mastertoken = key_response_data["mastertoken"]
+        self.keys.sequence_number = self._token_data(self.keys.mastertoken)["sequencenumber"]
 
         # Cache keys if path provided
         if self.cache_path:
@@ -213,10 +273,9 @@ class NetflixMSL:
             keys.rsa = RSA.import_key(data['rsa'])
             keys.mastertoken = data['mastertoken']
 
-            # Check if master token is expired
-            token_data = json.loads(
-                base64.b64decode(keys.mastertoken["tokendata"]).decode("utf-8")
-            )
+            # Check if master token is expired (older caches lack the decoded token fields)
+            token_data = data if 'expiration' in data else self._token_data(keys.mastertoken)
+            keys.sequence_number = token_data["sequencenumber"]
             expiration = datetime.utcfromtimestamp(int(token_data["expiration"]))
             hours_remaining = (expiration - datetime.now()).total_seconds() / 3600
 
@@ -237,16 +296,25 @@ class NetflixMSL:
 
         os.makedirs(os.path.dirname(self.cache_path), exist_ok=True)
 
+        token_data = self._token_data(self.keys.mastertoken)
         data = {
             'encryption': base64.b64encode(self.keys.encryption).decode(),
             'sign': base64.b64encode(self.keys.sign).decode(),
             'rsa': self.keys.rsa.export_key().decode(),
-            'mastertoken': self.keys.mastertoken
+            'mastertoken': self.keys.mastertoken,
+            # Decoded once here so loading the cache needn't parse the tokendata
+            'expiration': int(token_data["expiration"]),
+            'sequencenumber': token_data["sequencenumber"]
         }
 
         with open(self.cache_path, 'w') as f:
             json.dump(data, f)
 
+    @staticmethod
+    def _token_data(mastertoken):
+        """Decode a master token's tokendata (sequence number, expiration, ...)"""
+        return json.loads(base64.b64decode(mastertoken["tokendata"]).decode("utf-8"))
+
     @staticmethod
     def _base64key_decode(payload):
         """Decode base64-encoded key with proper padding"""
@@ -262,49 +330,42 @@ class NetflixMSL:
     @staticmethod
     def _gzip_compress(data):
         """Compress data with gzip"""
-        out = BytesIO()
-        with gzip.GzipFile(fileobj=out, mode="w") as fd:
-            fd.write(data)
-        return base64.b64encode(out.getvalue())
+        # Level 1 is plenty for a small JSON request; mtime=0 keeps the output deterministic
+        return base64.b64encode(gzip.compress(data, compresslevel=1, mtime=0))
 
     def _encrypt(self, plaintext):
-        """Encrypt plaintext with AES-CBC"""
+        """Encrypt plaintext bytes with AES-CBC and return the JSON envelope as bytes"""
         iv = get_random_bytes(16)
 
-        sequence_number = json.loads(
-            base64.b64decode(self.keys.mastertoken["tokendata"]).decode("utf-8")
-        )["sequencenumber"]
-
-        return json.dumps({
+        return orjson.dumps({
             "ciphertext": base64.b64encode(
                 AES.new(
                     self.keys.encryption,
                     AES.MODE_CBC,
                     iv
                 ).encrypt(
-                    Padding.pad(plaintext.encode("utf-8"), 16)
+                    Padding.pad(plaintext, 16)
                 )
             ).decode("utf-8"),
-            "keyid": f"{self.esn}_{sequence_number}",
+            "keyid": f"{self.esn}_{self.keys.sequence_number}",
             "sha256": "AA==",
             "iv": base64.b64encode(iv).decode("utf-8")
         })
 
-    def _sign(self, text):
-        """Sign text with HMAC-SHA256"""
+    def _sign(self, data):
+        """Sign data (bytes) with HMAC-SHA256"""
+        # hmac.digest is OpenSSL's one-shot HMAC (hardware SHA-256 where available)
         return base64.b64encode(
-            HMAC.new(self.keys.sign, text.encode("utf-8"), SHA256).digest()
+            hmac.digest(self.keys.sign, data, hashlib.sha256)
         )
 
     def _decrypt_payload_chunks(self, payload_chunks):
         """Decrypt and extract data from payload chunks"""
-        raw_data = ""
+        raw_data = []
 
         for payload_chunk in payload_chunks:
             # Decode payload
-            payload_chunk = json.loads(
-                base64.b64decode(payload_chunk["payload"]).decode("utf-8")
-            )
+            payload_chunk = orjson.loads(base64.b64decode(payload_chunk["payload"]))
 
             # Decrypt
             payload_decrypted = AES.new(
@@ -314,16 +375,17 @@ class NetflixMSL:
             ).decrypt(base64.b64decode(payload_chunk["ciphertext"]))
 
             payload_decrypted = Padding.unpad(payload_decrypted, 16)
-            payload_decrypted = json.loads(payload_decrypted.decode("utf-8"))
+            payload_decrypted = orjson.loads(payload_decrypted)
 
             # Decompress if needed
             payload_data = base64.b64decode(payload_decrypted["data"])
             if payload_decrypted.get("compressionalgo") == "GZIP":
                 payload_data = zlib.decompress(payload_data, 16 + zlib.MAX_WBITS)
 
-            raw_data += payload_data.decode("utf-8")
+            raw_data.append(payload_data)
 
-        data = json.loads(raw_data)
+        # Chunks are joined as bytes, so a character split across two chunks still decodes
+        data = orjson.loads(b"".join(raw_data))
 
         if "error" in data:
             error = data["error"]
@@ -331,6 +393,26 @@ class NetflixMSL:
 
         return data.get("result", data)
 
+    @staticmethod
+    def _parse_concatenated_json(data):
+        """
+        Parse an MSL response body: JSON objects written back to back ({...}{...})
+
+        :param data: Response body (bytes)
+        :return: List of the parsed objects
+        """
+        view = memoryview(data)
+        objects = []
+        start = 0
+        # Objects only hold base64 strings, so '}{' can only be a boundary
+        end = data.find(b"}{")
+        while end != -1:
+            objects.append(orjson.loads(view[start:end + 1]))
+            start = end + 1
+            end = data.find(b"}{", start)
+        objects.append(orjson.loads(view[start:]))
+        return objects
+
     def send_message(self, application_data, include_user_auth=True):
         """Send encrypted MSL message and return decrypted response"""
         self.message_id += 1
@@ -340,11 +422,7 @@ class NetflixMSL:
             "messageid": self.message_id,
             "renewable": True,
             "handshake": False,
-            "capabilities": {
-                "compressionalgos": ["GZIP"],
-                "languages": ["en-US"],
-                "encoderformats": ["JSON"]
-            },
+            "capabilities": self.CAPABILITIES,
             "timestamp": int(time.time()),
             "sender": self.esn,
             "nonreplayable": False,
@@ -370,27 +448,28 @@ class NetflixMSL:
                 }
             }
 
-        headerdata = self._encrypt(json.dumps(header_data))
+        headerdata = self._encrypt(orjson.dumps(header_data))
 
-        header = json.dumps({
-            "headerdata": base64.b64encode(headerdata.encode("utf-8")).decode("utf-8"),
-            "signature": self._sign(headerdata).decode("utf-8"),
-            "mastertoken": self.keys.mastertoken
-        })
+        # Base64 needs no JSON escaping, so the envelopes are joined from bytes without decoding
+        header = b"".join((
+            b'{"headerdata":"', base64.b64encode(headerdata),
+            b'","signature":"', self._sign(headerdata),
+            b'","mastertoken":', orjson.dumps(self.keys.mastertoken), b"}"
+        ))
 
         # Create payload
-        payload_chunk = self._encrypt(json.dumps({
+        payload_chunk = self._encrypt(orjson.dumps({
             "messageid": self.message_id,
-            "data": self._gzip_compress(json.dumps(application_data).encode("utf-8")).decode("utf-8"),
+            "data": self._gzip_compress(orjson.dumps(application_data)).decode("utf-8"),
             "compressionalgo": "GZIP",
             "sequencenumber": 1,
             "endofmsg": True
         }))
 
-        payload = json.dumps({
-            "payload": base64.b64encode(payload_chunk.encode("utf-8")).decode("utf-8"),
-            "signature": self._sign(payload_chunk).decode("utf-8")
-        })
+        payload = b"".join((
+            b'{"payload":"', base64.b64encode(payload_chunk),
+            b'","signature":"', self._sign(payload_chunk), b'"}'
+        ))
 
         message = header + payload
 
@@ -402,11 +481,11 @@ class NetflixMSL:
             raise Exception(f"MSL message send failed: {e}")
 
         # Parse response
-        parsed_message = json.loads("[{}]".format(r.text.replace("}{", "},{")))
+        parsed_message = self._parse_concatenated_json(r.content)
         header_response = parsed_message[0]
 
         if "errordata" in header_response:
-            error = json.loads(base64.b64decode(header_response["errordata"]).decode())
+            error = orjson.loads(base64.b64decode(header_response["errordata"]))
             raise Exception(f"MSL response error: {error.get('errormsg')}")
 
         payload_chunks = parsed_message[1:] if len(parsed_message) > 1 else []
@@ -425,54 +504,7 @@ class NetflixMSL:
         :return: Manifest data including DASH MPD
         """
         if profiles is None:
-            # Request a comprehensive set of profiles to detect all formats
-            profiles = [
-                # Video - H.264
-                "playready-h264mpl30-dash",
-                "playready-h264mpl31-dash",
-                "playready-h264hpl30-dash",
-                "playready-h264hpl31-dash",
-                # Video - HEVC SDR
-                "hevc-main-L30-dash-cenc",
-                "hevc-main-L31-dash-cenc",
-                "hevc-main10-L30-dash-cenc",
-                "hevc-main10-L31-dash-cenc",
-                "hevc-main10-L40-dash-cenc",
-                "hevc-main10-L41-dash-cenc",
-                "hevc-main10-L50-dash-cenc",
-                "hevc-main10-L51-dash-cenc",
-                # Video - HEVC HDR10
-                "hevc-hdr-main10-L30-dash-cenc",
-                "hevc-hdr-main10-L31-dash-cenc",
-                "hevc-hdr-main10-L40-dash-cenc",
-                "hevc-hdr-main10-L41-dash-cenc",
-                "hevc-hdr-main10-L50-dash-cenc",
-                "hevc-hdr-main10-L51-dash-cenc",
-                # Video - Dolby Vision
-                "hevc-dv-main10-L30-dash-cenc",
-                "hevc-dv-main10-L31-dash-cenc",
-                "hevc-dv-main10-L40-dash-cenc",
-                "hevc-dv-main10-L41-dash-cenc",
-                "hevc-dv-main10-L50-dash-cenc",
-                "hevc-dv-main10-L51-dash-cenc",
-                "hevc-dv5-main10-L30-dash-cenc",
-                "hevc-dv5-main10-L31-dash-cenc",
-                "hevc-dv5-main10-L40-dash-cenc",
-                "hevc-dv5-main10-L41-dash-cenc",
-                "hevc-dv5-main10-L50-dash-cenc",
-                "hevc-dv5-main10-L51-dash-cenc",
-                # Audio
-                "heaac-2-dash",
-                "heaac-2hq-dash",
-                "ddplus-2.0-dash",
-                "ddplus-5.1-dash",
-                "ddplus-5.1hq-dash",
-                "dd-5.1-dash",
-                "ddplus-atmos-dash",
-                # Subtitles
-                "webvtt-lssdh-ios8",
-                "dfxp-ls-sdh"
-            ]
+            profiles = self.DEFAULT_PROFILES
 
         # Build manifest request
         request_data = {
@@ -6,8 +6,37 @@ This avoids the complexity of MSL and uses Netflix's public APIs
 import requests
 import json
 import re
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as MetadataTimeout
 from http.cookiejar import MozillaCookieJar
 
+# Build identifier in the /browse page, matched on the raw bytes
+_RE_BUILD_ID = re.compile(rb'"BUILD_IDENTIFIER":"([^"]+)"')
+_RE_REACT_CONTEXT = re.compile(r'netflix\.reactContext\s*=\s*({.+?});', re.DOTALL)
+
+# Background pool for the Shakti metadata lookup, which runs alongside the title page GET.
+# Each Shakti request times out after METADATA_TIMEOUT seconds, and check_formats waits
+# at most that long for the lookup as a whole.
+_METADATA_EXECUTOR = ThreadPoolExecutor(max_workers=4, thread_name_prefix='shakti-metadata')
+METADATA_TIMEOUT = 15
+
+# Format indicators in the lowercased title page
+_FORMAT_PATTERNS = {
+    'uhd': ['ultra hd', '4k', 'uhd'],
+    'dolby_vision': ['dolby vision', 'dolbyvision', 'vision-enabled'],
+    'hdr10': ['hdr10', 'hdr-10', 'high dynamic range'],
+    'atmos': ['dolby atmos', 'atmosenabled', 'atmos-enabled'],
+}
+
+
+def _scan_formats(html_lower):
+    """Return the names of all formats whose patterns occur in the page
+
+    Plain substring checks: for these few short patterns str.find beats a
+    multi-pattern automaton, and each format stops at its first hit.
+    """
+    return {fmt for fmt, patterns in _FORMAT_PATTERNS.items()
+            if any(pattern in html_lower for pattern in patterns)}
+
 
 class NetflixSimple:
     """Simple Netflix metadata fetcher"""
@@ -15,6 +44,9 @@ class NetflixSimple:
     def __init__(self, cookies_path):
         self.cookies_path = cookies_path
         self.session = requests.Session()
+        # The Shakti calls get their own session, as they run on another thread (see check_formats)
+        self.metadata_session = requests.Session()
+        self._build_id = None
         self._load_cookies()
         self._setup_headers()
 
@@ -23,30 +55,33 @@ class NetflixSimple:
         jar = MozillaCookieJar(self.cookies_path)
         jar.load(ignore_discard=True, ignore_expires=True)
         self.session.cookies = jar
+        self.metadata_session.cookies = requests.cookies.RequestsCookieJar()
+        self.metadata_session.cookies.update(jar)
 
     def _setup_headers(self):
         """Setup request headers"""
-        self.session.headers.update({
+        headers = {
             'User-Agent': 'Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36',
             'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,image/webp,*/*;q=0.8',
             'Accept-Language': 'en-US,en;q=0.5',
             'DNT': '1',
             'Connection': 'keep-alive',
             'Upgrade-Insecure-Requests': '1',
-        })
+        }
+        self.session.headers.update(headers)
+        self.metadata_session.headers.update(headers)
 
     def get_build_identifier(self):
-        """Get Netflix build identifier from homepage"""
-        try:
-            r = self.session.get('https://www.netflix.com/browse')
-            match = re.search(r'"BUILD_IDENTIFIER":"([^"]+)"', r.text)
-            if match:
-                return match.group(1)
+        """Get Netflix build identifier from homepage (fetched once per session)"""
+        if self._build_id:
+            return self._build_id
 
-            # Alternative pattern
-            match = re.search(r'netflix\.reactContext\s*=.*?"BUILD_IDENTIFIER":"([^"]+)"', r.text)
+        try:
+            r = self.metadata_session.get('https://www.netflix.com/browse', timeout=METADATA_TIMEOUT)
+            match = _RE_BUILD_ID.search(r.content)
             if match:
-                return match.group(1)
+                self._build_id = match.group(1).decode('utf-8')
+                return self._build_id
 
             return "vf633bfcf"  # Fallback
         except:
@@ -70,7 +105,7 @@ class NetflixSimple:
         }
 
         try:
-            r = self.session.get(metadata_url, params=params)
+            r = self.metadata_session.get(metadata_url, params=params, timeout=METADATA_TIMEOUT)
             r.raise_for_status()
             return r.json()
         except:
@@ -89,7 +124,7 @@ class NetflixSimple:
         }
 
         try:
-            r = self.session.get(path_url, params=params)
+            r = self.metadata_session.get(path_url, params=params, timeout=METADATA_TIMEOUT)
             r.raise_for_status()
             data = r.json()
 
@@ -120,6 +155,9 @@ class NetflixSimple:
             'audio_formats': []
         }
 
+        # Fetch Shakti metadata in the background while the title page loads
+        metadata_future = _METADATA_EXECUTOR.submit(self.get_title_metadata, title_id)
+
         try:
             # Get the title page
             url = f"https://www.netflix.com/title/{title_id}"
@@ -128,7 +166,11 @@ class NetflixSimple:
             html = r.text
 
             # Try to get metadata from Shakti API
-            metadata = self.get_title_metadata(title_id)
+            try:
+                metadata = metadata_future.result(timeout=METADATA_TIMEOUT)
+            except MetadataTimeout:
+                print(f"Metadata lookup took longer than {METADATA_TIMEOUT}s, using the page only")
+                metadata = None
             if metadata:
                 # Extract title
                 if 'title' in metadata:
@@ -149,27 +191,12 @@ class NetflixSimple:
                     if 'hasDolbyAtmos' in delivery or 'hasAtmos' in delivery:
                         result['atmos'] = True
 
-            # Also check HTML for format indicators
-            html_lower = html.lower()
-
-            # Check for UHD/4K
-            if any(x in html_lower for x in ['ultra hd', '4k', 'uhd']):
-                result['uhd'] = True
-
-            # Check for Dolby Vision
-            if any(x in html_lower for x in ['dolby vision', 'dolbyvision', 'vision-enabled']):
-                result['dolby_vision'] = True
-
-            # Check for HDR
-            if any(x in html_lower for x in ['hdr10', 'hdr-10', 'high dynamic range']):
-                result['hdr10'] = True
-
-            # Check for Atmos
-            if any(x in html_lower for x in ['dolby atmos', 'atmosenabled', 'atmos-enabled']):
-                result['atmos'] = True
+            # Also check HTML for format indicators (UHD/4K, Dolby Vision, HDR, Atmos)
+            for fmt in _scan_formats(html.lower()):
+                result[fmt] = True
 
             # Try to extract from React context
-            match = re.search(r'netflix\.reactContext\s*=\s*({.+?});', html, re.DOTALL)
+            match = _RE_REACT_CONTEXT.search(html)
             if match:
                 try:
                     react_data = json.loads(match.group(1))
@@ -0,0 +1,103 @@
+#!/usr/bin/env python3
+"""
+Test script for the MSL message envelopes assembled from bytes in send_message
+
+Each envelope must parse to the same object, keys in the same order, as the
+json.dumps form it replaced. No network: the session only records the body.
+"""
+
+import base64
+import json
+import os
+
+from netflix_msl import MSLKeys, NetflixMSL
+
+
+class RecordingSession:
+    """Stands in for the MSL session and keeps the posted body"""
+
+    def __init__(self):
+        self.body = None
+
+    def post(self, url, data=None):
+        self.body = data
+        return self
+
+    def raise_for_status(self):
+        pass
+
+    @property
+    def content(self):
+        return b'{"headerdata":"AA=="}'
+
+
+def make_client(mastertoken):
+    """NetflixMSL with fixed keys, skipping the handshake"""
+    msl = NetflixMSL.__new__(NetflixMSL)
+    msl.esn = "NFCDIE-03-TESTESN"
+    msl.cookies = {"NetflixId": "nid", "SecureNetflixId": "snid"}
+    msl.endpoint = "https://www.netflix.com/api/shakti/msl"
+    msl.message_id = 1
+    msl.keys = MSLKeys(
+        encryption=os.urandom(16),
+        sign=os.urandom(32),
+        mastertoken=mastertoken,
+        sequence_number=1,
+    )
+    msl.session = RecordingSession()
+    return msl
+
+
+def split_message(body):
+    """Split the posted body into its back-to-back JSON objects"""
+    text = body.decode("utf-8")
+    decoder = json.JSONDecoder()
+    objects = []
+    pos = 0
+    while pos < len(text):
+        obj, pos = decoder.raw_decode(text, pos)
+        objects.append(obj)
+    return objects
+
+
+def check_envelopes(mastertoken):
+    msl = make_client(mastertoken)
+    msl.send_message({"version": 2, "url": "/manifest"})
+
+    header, payload = split_message(msl.session.body)
+
+    # Sign the parsed fields again and build what json.dumps used to send
+    headerdata = header["headerdata"]
+    expected_header = json.loads(json.dumps({
+        "headerdata": headerdata,
+        "signature": msl._sign(base64.b64decode(headerdata)).decode("utf-8"),
+        "mastertoken": mastertoken
+    }))
+    assert header == expected_header, (header, expected_header)
+    assert list(header) == list(expected_header), list(header)
+
+    payloaddata = payload["payload"]
+    expected_payload = json.loads(json.dumps({
+        "payload": payloaddata,
+        "signature": msl._sign(base64.b64decode(payloaddata)).decode("utf-8")
+    }))
+    assert payload == expected_payload, (payload, expected_payload)
+    assert list(payload) == list(expected_payload), list(payload)
+
+
+print("Testing MSL envelope assembly\n" + "="*60)
+
+# Test 1: Plain master token (base64 tokendata and signature)
+print("\n[Test 1] Plain master token")
+print("-" * 60)
+check_envelopes({"tokendata": "dG9rZW4=", "signature": "c2ln"})
+print("  ✓ Header and payload match the json.dumps envelopes")
+
+# Test 2: Master token with characters that need JSON escaping
+print("\n[Test 2] Master token needing escapes")
+print("-" * 60)
+check_envelopes({"tokendata": 'quote " slash \\ brace }{ tab \t é', "signature": " "})
+print("  ✓ Escaped master token round-trips unchanged")
+
+print("\n" + "="*60)
+print("Test completed!")
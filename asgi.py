@@ -0,0 +1,13 @@
+"""
+Netflix Format Checker - ASGI Entry Point
+
+Wraps the Flask WSGI application for ASGI servers.
+
+Usage:
+    uvicorn asgi:application --loop uvloop --http httptools
+"""
+
+from asgiref.wsgi import WsgiToAsgi
+from app import create_app
+
+application = WsgiToAsgi(create_app())
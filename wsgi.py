@@ -0,0 +1,16 @@
+"""
+Netflix Format Checker - WSGI Entry Point
+
+Exposes the Flask application for WSGI servers.
+
+Usage:
+    gunicorn -w 4 --preload --threads 4 wsgi:application
+"""
+
+from app import create_app
+from app.models import NetflixScraper, PosterFetcher  # noqa: F401
+
+application = create_app()
+
+# Warm up in the master so preloaded workers inherit it
+NetflixScraper.warmup()